@@ -1,13 +1,31 @@
+from functools import cache
 from pathlib import Path
 
-import tomli
-
 
 def _get_project_meta() -> dict:
+    # tomli is needed only when version metadata was not generated at build time
+    import tomli  # pylint: disable=import-outside-toplevel
+
     toml_path = Path(__file__).parents[1].joinpath('pyproject.toml')
 
     with toml_path.open(mode='rb') as pyproject:
         return tomli.load(pyproject)['tool']['poetry']
 
 
-__version__ = _get_project_meta()['version']
+@cache
+def _get_version() -> str:
+    try:
+        # Generated when building docker image
+        # pylint: disable-next=import-outside-toplevel
+        from periodic_tasks._version import VERSION
+
+        return VERSION
+    except ImportError:
+        return _get_project_meta()['version']
+
+
+def __getattr__(name: str) -> str:
+    # Resolve version on first access instead of import time
+    if name == '__version__':
+        return _get_version()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,99 @@
+"""
+Benchmark of subgraph rows decoding.
+Compares address normalization with and without the checksum address cache
+on a page of rows where vault addresses repeat.
+
+Usage: python -m periodic_tasks.benchmarks.decoders [--rows N] [--vaults N]
+"""
+import argparse
+import logging
+import secrets
+import time
+from typing import Callable
+
+from web3 import Web3
+
+from periodic_tasks.common.logs import setup_logging
+from periodic_tasks.common.typings import Vault
+from periodic_tasks.common.utils import to_checksum_address
+from periodic_tasks.exit.typings import ExitRequest
+
+logger = logging.getLogger(__name__)
+
+
+def random_address() -> str:
+    return '0x' + secrets.token_hex(20)
+
+
+def build_exit_request_rows(rows_count: int, vaults: list[str]) -> list[dict]:
+    return [
+        {
+            'id': f'{vaults[i % len(vaults)]}-{i}',
+            'positionTicket': str(i),
+            'timestamp': '1700000000',
+            'exitQueueIndex': None,
+            'isClaimed': False,
+            'isClaimable': True,
+            'exitedAssets': '1000',
+            'totalAssets': '1000',
+            'vault': {'id': vaults[i % len(vaults)]},
+        }
+        for i in range(rows_count)
+    ]
+
+
+def build_vault_rows(rows_count: int, vaults: list[str]) -> list[dict]:
+    return [
+        {
+            'id': vaults[i % len(vaults)],
+            'isMetaVault': True,
+            'subVaults': [{'subVault': vault} for vault in vaults[:3]],
+            'canHarvest': True,
+            'proof': None,
+            'proofReward': None,
+            'proofUnlockedMevReward': None,
+            'rewardsRoot': None,
+        }
+        for i in range(rows_count)
+    ]
+
+
+def measure(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Measure subgraph rows decoding time')
+    parser.add_argument('--rows', type=int, default=10_000, help='Number of rows in a page')
+    parser.add_argument('--vaults', type=int, default=50, help='Number of distinct vaults')
+    args = parser.parse_args()
+
+    vaults = [random_address() for _ in range(args.vaults)]
+    exit_request_rows = build_exit_request_rows(args.rows, vaults)
+    vault_rows = build_vault_rows(args.rows, vaults)
+    addresses = [row['vault']['id'] for row in exit_request_rows]
+
+    uncached_time = measure(lambda: [Web3.to_checksum_address(a) for a in addresses])
+    to_checksum_address.cache_clear()
+    cached_time = measure(lambda: [to_checksum_address(a) for a in addresses])
+    logger.info(
+        'Checksum %d addresses: uncached %.3f sec, cached %.3f sec (x%.1f)',
+        len(addresses),
+        uncached_time,
+        cached_time,
+        uncached_time / cached_time,
+    )
+
+    to_checksum_address.cache_clear()
+    exit_requests_time = measure(lambda: [ExitRequest.from_graph(r) for r in exit_request_rows])
+    vaults_time = measure(lambda: [Vault.from_graph(r) for r in vault_rows])
+    logger.info('Decode %d exit requests: %.3f sec', args.rows, exit_requests_time)
+    logger.info('Decode %d vaults: %.3f sec', args.rows, vaults_time)
+    logger.info('Checksum cache: %s', to_checksum_address.cache_info())
+
+
+if __name__ == '__main__':
+    setup_logging()
+    main()
@@ -0,0 +1,87 @@
+"""
+Startup benchmark for the periodic tasks entry points.
+Each measurement runs in a fresh interpreter and reports
+the time to import the task module and the time of the first execution request.
+
+Usage: python -m periodic_tasks.benchmarks.startup [--runs N] [--no-requests]
+"""
+import argparse
+import json
+import logging
+import statistics
+import subprocess  # nosec
+import sys
+
+from periodic_tasks.common.logs import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# Entry point name -> (task module, module holding the execution client)
+ENTRY_POINTS = {
+    'force_exit': ('periodic_tasks.exit.tasks', 'periodic_tasks.common.clients'),
+    'update_ltv': ('periodic_tasks.ltv.tasks', 'periodic_tasks.common.clients'),
+    'meta_vault_cli': ('periodic_tasks.meta_vault.tasks', 'periodic_tasks.common.clients'),
+    'update_price': ('periodic_tasks.price.tasks', 'periodic_tasks.price.clients'),
+}
+
+CLIENT_NAMES = {
+    'periodic_tasks.common.clients': 'execution_client',
+    'periodic_tasks.price.clients': 'sender_execution_client',
+}
+
+MEASURE_CODE = '''
+import asyncio, importlib, json, sys, time
+
+start = time.perf_counter()
+importlib.import_module({task_module!r})
+import_time = time.perf_counter() - start
+
+first_request_time = None
+if {with_request!r}:
+    client = getattr(importlib.import_module({client_module!r}), {client_name!r})
+    start = time.perf_counter()
+    asyncio.run(client.eth.get_block_number())
+    first_request_time = time.perf_counter() - start
+
+sys.stdout.write(json.dumps({{'import': import_time, 'first_request': first_request_time}}))
+'''
+
+
+def measure(entry_point: str, with_request: bool) -> dict:
+    task_module, client_module = ENTRY_POINTS[entry_point]
+    code = MEASURE_CODE.format(
+        task_module=task_module,
+        client_module=client_module,
+        client_name=CLIENT_NAMES[client_module],
+        with_request=with_request,
+    )
+    result = subprocess.run(  # nosec
+        [sys.executable, '-c', code], capture_output=True, check=True, text=True
+    )
+    return json.loads(result.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Measure entry points startup time')
+    parser.add_argument('--runs', type=int, default=5, help='Number of runs per entry point')
+    parser.add_argument(
+        '--no-requests', action='store_true', help='Measure import time only, without RPC calls'
+    )
+    parser.add_argument(
+        'entry_points', nargs='*', default=list(ENTRY_POINTS), help='Entry points to measure'
+    )
+    args = parser.parse_args()
+
+    for entry_point in args.entry_points:
+        results = [measure(entry_point, not args.no_requests) for _ in range(args.runs)]
+        import_time = statistics.median(r['import'] for r in results)
+        logger.info('%s: import %.3f sec (median of %d)', entry_point, import_time, args.runs)
+
+        if not args.no_requests:
+            first_request_time = statistics.median(r['first_request'] for r in results)
+            logger.info('%s: first request %.3f sec', entry_point, first_request_time)
+
+
+if __name__ == '__main__':
+    setup_logging()
+    main()
@@ -0,0 +1,61 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
+
+from periodic_tasks.common.settings import DATA_DIR, NETWORK
+
+
+class CheckpointStore:
+    """
+    Key-value store for event cursors and slowly changing facts, shared between runs.
+    Values are JSON encoded and kept in SQLite.
+    """
+
+    def __init__(self, database: str):
+        self._connection = sqlite3.connect(database)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS checkpoints '
+            '(key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)'
+        )
+        self._connection.commit()
+
+    def get(self, key: str, max_age: float | None = None) -> Any | None:
+        """
+        Returns stored value or None.
+        Values older than `max_age` seconds are treated as missing.
+        """
+        row = self._connection.execute(
+            'SELECT value, updated_at FROM checkpoints WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, updated_at = row
+        if max_age is not None and time.time() - updated_at > max_age:
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        self._connection.execute(
+            'INSERT OR REPLACE INTO checkpoints (key, value, updated_at) VALUES (?, ?, ?)',
+            (key, json.dumps(value), time.time()),
+        )
+        self._connection.commit()
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """
+    Returns store persisted under DATA_DIR.
+    Falls back to in-memory store when DATA_DIR is not set.
+    """
+    if not DATA_DIR:
+        return CheckpointStore(':memory:')
+
+    data_dir = Path(DATA_DIR)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return CheckpointStore(str(data_dir / f'checkpoints-{NETWORK}.sqlite'))
+
+
+checkpoint_store = get_checkpoint_store()
@@ -5,6 +5,7 @@ from eth_account.signers.local import LocalAccount
 from web3 import AsyncWeb3, Web3
 from web3.middleware.signing import async_construct_sign_and_send_raw_middleware
 
+from periodic_tasks.common.instrumentation import rpc_instrumentation_middleware
 from periodic_tasks.common.settings import EXECUTION_ENDPOINT, HOT_WALLET_PRIVATE_KEY
 
 logger = logging.getLogger(__name__)
@@ -12,6 +13,7 @@ logger = logging.getLogger(__name__)
 
 def get_execution_client(endpoint: str = EXECUTION_ENDPOINT) -> AsyncWeb3:
     client = AsyncWeb3(Web3.AsyncHTTPProvider(endpoint))
+    client.middleware_onion.add(rpc_instrumentation_middleware, 'instrumentation')
     return client
 
 
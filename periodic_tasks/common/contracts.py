@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import sys
@@ -5,34 +6,115 @@ from pathlib import Path
 from typing import cast
 
 from hexbytes import HexBytes
-from web3 import AsyncWeb3
+from web3 import AsyncWeb3, Web3
 from web3.contract.async_contract import (
+    AsyncContract,
     AsyncContractEvent,
     AsyncContractEvents,
     AsyncContractFunctions,
 )
 from web3.types import BlockNumber, ChecksumAddress, EventData, HexStr, Wei
 
+from .checkpoints import checkpoint_store
 from .clients import execution_client
-from .settings import EVENTS_BLOCKS_RANGE_INTERVAL, network_config
-from .typings import HarvestParams
+from .execution import transaction_gas_wrapper
+from .settings import (
+    EVENTS_BLOCKS_RANGE_INTERVAL,
+    EVENTS_CONCURRENCY,
+    EVENTS_MAX_BLOCKS_RANGE,
+    EVENTS_MIN_BLOCKS_RANGE,
+    MULTICALL_BATCH_SIZE,
+    network_config,
+)
+from .typings import CacheStats, HarvestParams
+from .utils import chunkify
 
 logger = logging.getLogger(__name__)
 
+REWARDS_UPDATED_BLOCK_CHECKPOINT = 'keeper_rewards_updated_block'
+
+
+class ContractRegistry:
+    """
+    Process-wide cache of parsed ABI files and web3 contract objects.
+    Contract objects are reused per (abi, address, client).
+    """
+
+    def __init__(self) -> None:
+        self._abis: dict[Path, dict] = {}
+        self._contracts: dict[tuple[Path, ChecksumAddress, AsyncWeb3], AsyncContract] = {}
+        self.abi_stats = CacheStats()
+        self.contract_stats = CacheStats()
+
+    def get_abi(self, abi_path: Path) -> dict:
+        abi = self._abis.get(abi_path)
+        if abi is not None:
+            self.abi_stats.hits += 1
+            return abi
+
+        self.abi_stats.misses += 1
+        with abi_path.open(encoding='utf-8') as f:
+            abi = json.load(f)
+        self._abis[abi_path] = abi
+        return abi
+
+    def get_contract(
+        self, abi_path: Path, address: ChecksumAddress, client: AsyncWeb3
+    ) -> AsyncContract:
+        key = (abi_path, address, client)
+        contract = self._contracts.get(key)
+        if contract is not None:
+            self.contract_stats.hits += 1
+            return contract
+
+        self.contract_stats.misses += 1
+        contract = client.eth.contract(address=address, abi=self.get_abi(abi_path))
+        self._contracts[key] = contract
+        return contract
+
+    def log_stats(self) -> None:
+        logger.debug(
+            'Contract registry hit rate: ABI %.2f (%d hits, %d misses), '
+            'contracts %.2f (%d hits, %d misses)',
+            self.abi_stats.hit_rate,
+            self.abi_stats.hits,
+            self.abi_stats.misses,
+            self.contract_stats.hit_rate,
+            self.contract_stats.hits,
+            self.contract_stats.misses,
+        )
+
+
+contract_registry = ContractRegistry()
+
 
 class ContractWrapper:
     def __init__(self, abi_path: str, address: ChecksumAddress, client: AsyncWeb3):
         self.address = address
-        self.contract = client.eth.contract(address=address, abi=self._load_abi(abi_path))
+        self._abi_path = abi_path
+        self._client = client
+        self._contract: AsyncContract | None = None
+        # Log window size, adapted to provider limits by `_get_last_event`
+        self._events_blocks_range = EVENTS_BLOCKS_RANGE_INTERVAL
 
-    def _load_abi(self, abi_path: str) -> dict:
+    def _get_abi_path(self, abi_path: str) -> Path:
         # get subclass file path
         file = sys.modules[self.__class__.__module__].__file__
         if not file:
             raise IndexError("Can't get abi file path")
         current_dir = Path(file).parent
-        with (current_dir / abi_path).open(encoding='utf-8') as f:
-            return json.load(f)
+        return current_dir / abi_path
+
+    @property
+    def contract(self) -> AsyncContract:
+        # Module-level contracts are created on first use to keep imports cheap
+        if self._contract is None:
+            self._contract = contract_registry.get_contract(
+                abi_path=self._get_abi_path(self._abi_path),
+                address=self.address,
+                client=self._client,
+            )
+        return self._contract
 
     @property
     def functions(self) -> AsyncContractFunctions:
@@ -58,18 +140,53 @@ class ContractWrapper:
         to_block: BlockNumber,
         argument_filters: dict | None = None,
     ) -> EventData | None:
-        blocks_range = EVENTS_BLOCKS_RANGE_INTERVAL
+        """
+        Walks backward from `to_block` and returns the newest matching event.
+        Several log windows are fetched concurrently.
+        The window shrinks when the provider rejects the range
+        and grows while windows come back empty.
+        """
         while to_block >= from_block:
-            events = await event.get_logs(
-                fromBlock=BlockNumber(max(to_block - blocks_range, from_block)),
-                toBlock=to_block,
-                argument_filters=argument_filters,
-            )
-            if events:
-                return events[-1]
-            to_block = BlockNumber(to_block - blocks_range - 1)
+            windows: list[tuple[BlockNumber, BlockNumber]] = []
+            window_to_block = to_block
+            while len(windows) < EVENTS_CONCURRENCY and window_to_block >= from_block:
+                window_from_block = BlockNumber(
+                    max(window_to_block - self._events_blocks_range, from_block)
+                )
+                windows.append((window_from_block, window_to_block))
+                window_to_block = BlockNumber(window_from_block - 1)
+
+            try:
+                windows_events = await asyncio.gather(
+                    *(
+                        event.get_logs(
+                            fromBlock=window_from_block,
+                            toBlock=window_to_block,
+                            argument_filters=argument_filters,
+                        )
+                        for window_from_block, window_to_block in windows
+                    )
+                )
+            except ValueError as e:
+                self._reduce_events_blocks_range(e)
+                continue
+
+            # Windows are ordered from the newest to the oldest
+            for events in windows_events:
+                if events:
+                    return events[-1]
+
+            to_block = window_to_block
+            self._events_blocks_range = min(self._events_blocks_range * 2, EVENTS_MAX_BLOCKS_RANGE)
         return None
 
+    def _reduce_events_blocks_range(self, e: ValueError) -> None:
+        # Provider rejected the range or the number of results
+        if self._events_blocks_range <= EVENTS_MIN_BLOCKS_RANGE:
+            raise e
+        self._events_blocks_range = max(self._events_blocks_range // 2, EVENTS_MIN_BLOCKS_RANGE)
+        logger.debug('Reduced events blocks range to %d', self._events_blocks_range)
+
 
 class VaultEncoder:
     def __init__(self, contract: ContractWrapper):
@@ -88,14 +205,14 @@ class VaultEncoder:
             ],
         )
 
+    def get_exit_queue_index(self, position_ticket: int) -> HexStr:
+        return self.contract.encode_abi(fn_name='getExitQueueIndex', args=[position_ticket])
+
 
 class VaultContract(ContractWrapper):
     def encoder(self) -> VaultEncoder:
         return VaultEncoder(self)
 
-    async def get_exit_queue_index(self, position_ticket: int) -> int:
-        return await self.contract.functions.getExitQueueIndex(position_ticket).call()
-
 
 class MulticallContract(ContractWrapper):
     async def aggregate(
@@ -105,19 +222,86 @@ class MulticallContract(ContractWrapper):
     ) -> tuple[BlockNumber, list]:
         return await self.contract.functions.aggregate(data).call(block_identifier=block_number)
 
+    async def aggregate3(
+        self,
+        data: list[tuple[ChecksumAddress, bool, HexStr]],
+        block_number: BlockNumber | None = None,
+    ) -> list[tuple[bool, bytes]]:
+        """
+        Calls are tuples of (target, allow failure, call data).
+        Returns (success, return data) for each call,
+        calls allowed to fail do not revert the whole batch.
+        """
+        return await self.contract.functions.aggregate3(data).call(block_identifier=block_number)
+
+    async def aggregate_batches(
+        self,
+        data: list[tuple[ChecksumAddress, HexStr]],
+        block_number: BlockNumber,
+        batch_size: int = MULTICALL_BATCH_SIZE,
+    ) -> list[bytes]:
+        """
+        Splits calls into batches of `batch_size` and aggregates them at the same block.
+        Returns results in the order of calls.
+        """
+        results: list[bytes] = []
+        for batch in chunkify(data, batch_size):
+            _, response = await self.aggregate(list(batch), block_number)
+            results.extend(response)
+        return results
+
     async def tx_aggregate(
         self,
         data: list[tuple[ChecksumAddress, HexStr]],
     ) -> HexStr:
-        tx_hash = await self.contract.functions.aggregate(data).transact()
+        tx_hash = await transaction_gas_wrapper(
+            client=self.contract.w3, tx_function=self.contract.functions.aggregate(data)
+        )
         return HexStr(tx_hash.hex())
 
 
 class KeeperContract(ContractWrapper):
+    def __init__(self, abi_path: str, address: ChecksumAddress, client: AsyncWeb3):
+        super().__init__(abi_path=abi_path, address=address, client=client)
+        # canHarvest results for a single block, dropped when the block changes
+        self._can_harvest_block: BlockNumber | None = None
+        self._can_harvest_cache: dict[ChecksumAddress, bool] = {}
+
     async def can_harvest(
         self, vault: ChecksumAddress, block_number: BlockNumber | None = None
     ) -> bool:
-        return await self.contract.functions.canHarvest(vault).call(block_identifier=block_number)
+        if block_number is None:
+            return await self.contract.functions.canHarvest(vault).call()
+
+        self._reset_can_harvest_cache(block_number)
+        if vault not in self._can_harvest_cache:
+            self._can_harvest_cache[vault] = await self.contract.functions.canHarvest(vault).call(
+                block_identifier=block_number
+            )
+        return self._can_harvest_cache[vault]
+
+    async def prefetch_can_harvest(
+        self, vaults: list[ChecksumAddress], block_number: BlockNumber
+    ) -> None:
+        """
+        Fills canHarvest cache for the given vaults with a single multicall.
+        """
+        self._reset_can_harvest_cache(block_number)
+        vaults = [vault for vault in set(vaults) if vault not in self._can_harvest_cache]
+        if not vaults:
+            return
+
+        calls = [
+            (self.address, self.encode_abi(fn_name='canHarvest', args=[vault])) for vault in vaults
+        ]
+        response = await multicall_contract.aggregate_batches(calls, block_number)
+        for vault, data in zip(vaults, response):
+            self._can_harvest_cache[vault] = bool(Web3.to_int(data))
+
+    def _reset_can_harvest_cache(self, block_number: BlockNumber) -> None:
+        if block_number != self._can_harvest_block:
+            self._can_harvest_block = block_number
+            self._can_harvest_cache = {}
 
     async def get_last_rewards_updated_event(
         self, from_block: BlockNumber, to_block: BlockNumber
@@ -128,13 +312,28 @@ class KeeperContract(ContractWrapper):
             to_block=to_block,
         )
 
+    async def get_last_rewards_updated_block(self, to_block: BlockNumber) -> BlockNumber | None:
+        """
+        Returns block number of the latest RewardsUpdated event.
+        The search starts from the block saved in the checkpoint store by the previous run.
+        """
+        checkpoint_block = checkpoint_store.get(REWARDS_UPDATED_BLOCK_CHECKPOINT)
+        if checkpoint_block is not None and checkpoint_block > to_block:
+            checkpoint_block = None
+
+        from_block = (
+            checkpoint_block
+            if checkpoint_block is not None
+            else network_config.KEEPER_GENESIS_BLOCK
+        )
+        event = await self.get_last_rewards_updated_event(
+            from_block=BlockNumber(from_block), to_block=to_block
+        )
+        if event is None:
+            return checkpoint_block
 
-def get_vault_contract(address: ChecksumAddress) -> VaultContract:
-    return VaultContract(
-        abi_path='abi/IEthVault.json',
-        address=address,
-        client=execution_client,
-    )
+        checkpoint_store.set(REWARDS_UPDATED_BLOCK_CHECKPOINT, event['blockNumber'])
+        return BlockNumber(event['blockNumber'])
 
 
 multicall_contract = MulticallContract(
@@ -1,32 +1,116 @@
 import asyncio
 import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
-from eth_typing import HexStr
+from eth_typing import ChecksumAddress, HexStr
 from hexbytes import HexBytes
-from sw_utils import GasManager
 from web3 import AsyncWeb3, Web3
 from web3.contract.async_contract import AsyncContractFunction
-from web3.types import TxParams
+from web3.exceptions import TimeExhausted, TransactionNotFound
+from web3.types import BlockIdentifier, Nonce, TxParams, TxReceipt
 
+from periodic_tasks.common.clients import hot_wallet_account
+from periodic_tasks.common.fees import get_fee_oracle
+from periodic_tasks.common.instrumentation import (
+    track_transaction_receipt,
+    track_transaction_submitted,
+)
 from periodic_tasks.common.settings import (
     ATTEMPTS_WITH_DEFAULT_GAS,
     EXECUTION_TRANSACTION_TIMEOUT,
-    MAX_FEE_PER_GAS,
-    PRIORITY_FEE_NUM_BLOCKS,
-    PRIORITY_FEE_PERCENTILE,
-    network_config,
 )
 
 logger = logging.getLogger(__name__)
 
+NONCE_ERRORS = ('nonce too low', 'already known', 'replacement transaction underpriced')
 
-def build_gas_manager(execution_client: AsyncWeb3) -> GasManager:
-    return GasManager(
-        execution_client=execution_client,
-        max_fee_per_gas=MAX_FEE_PER_GAS,
-        priority_fee_num_blocks=PRIORITY_FEE_NUM_BLOCKS,
-        priority_fee_percentile=PRIORITY_FEE_PERCENTILE,
-    )
+
+class NonceManager:
+    """
+    Assigns nonces locally so that several transactions
+    from the same account can be in flight at once.
+    Nonce is resynced from the node after nonce errors and dropped transactions.
+    """
+
+    def __init__(self, client: AsyncWeb3, address: ChecksumAddress):
+        self.client = client
+        self.address = address
+        self._nonce: Nonce | None = None
+        # `pending` includes own in-flight transactions,
+        # `latest` is used to refill gaps left by dropped transactions
+        self._sync_block: BlockIdentifier = 'pending'
+        # submitted transactions without receipt, tx hash -> nonce
+        self._unconfirmed: dict[HexStr, Nonce] = {}
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def use_nonce(self) -> AsyncIterator[Nonce]:
+        """
+        Yields the next nonce. The nonce is consumed only if the block exits without errors,
+        so failed submissions do not leave gaps.
+        """
+        async with self._lock:
+            if self._nonce is None:
+                self._nonce = await self.client.eth.get_transaction_count(
+                    self.address, self._sync_block
+                )
+                if self._sync_block == 'latest':
+                    self._forget_mined(Nonce(self._nonce - 1))
+                self._sync_block = 'pending'
+            try:
+                yield self._nonce
+            except ValueError as e:
+                if _is_nonce_error(e):
+                    logger.warning('Nonce %d is out of sync, resyncing', self._nonce)
+                    self.reset()
+                raise
+            self._nonce = Nonce(self._nonce + 1)
+
+    def reset(self, sync_block: BlockIdentifier = 'pending') -> None:
+        self._nonce = None
+        self._sync_block = sync_block
+
+    def track_transaction(self, tx_hash: HexStr, nonce: Nonce) -> None:
+        self._unconfirmed[tx_hash] = nonce
+
+    def confirm_transaction(self, tx_hash: HexStr) -> None:
+        nonce = self._unconfirmed.pop(tx_hash, None)
+        if nonce is not None:
+            # transactions with lower nonces are mined as well
+            self._forget_mined(nonce)
+
+    async def handle_receipt_timeout(self, tx_hash: HexStr) -> None:
+        """
+        Resyncs the nonce if the transaction was dropped by the node.
+        A transaction still pending keeps its nonce, so it is not replaced.
+        """
+        try:
+            await self.client.eth.get_transaction(tx_hash)
+        except TransactionNotFound:
+            logger.warning('Transaction %s was dropped, resyncing nonce', tx_hash)
+            self._unconfirmed.pop(tx_hash, None)
+            # `latest` would reuse nonces of own transactions that can still be mined,
+            # refill the gap only when none of them is left
+            self.reset(sync_block='pending' if self._unconfirmed else 'latest')
+
+    def _forget_mined(self, nonce: Nonce) -> None:
+        self._unconfirmed = {
+            tx_hash: tx_nonce for tx_hash, tx_nonce in self._unconfirmed.items() if tx_nonce > nonce
+        }
+
+
+_nonce_managers: dict[AsyncWeb3, NonceManager] = {}
+
+
+def get_nonce_manager(client: AsyncWeb3) -> NonceManager:
+    """Returns nonce manager bound to the hot wallet account for the given client."""
+    if not hot_wallet_account:
+        raise ValueError('Set HOT_WALLET_PRIVATE_KEY environment variable')
+
+    if client not in _nonce_managers:
+        _nonce_managers[client] = NonceManager(client=client, address=hot_wallet_account.address)
+    return _nonce_managers[client]
 
 
 async def transaction_gas_wrapper(
@@ -35,12 +119,14 @@ async def transaction_gas_wrapper(
     """Handles periods with high gas in the network."""
     if not tx_params:
         tx_params = {}
-    gas_manager = build_gas_manager(client)
+    fee_oracle = get_fee_oracle(client)
 
     # trying to submit with basic gas
     for i in range(ATTEMPTS_WITH_DEFAULT_GAS):
         try:
-            return await tx_function.transact(tx_params)
+            return await _transact(
+                client, tx_function, await fee_oracle.get_tx_params() | tx_params
+            )
         except ValueError as e:
             # Handle only FeeTooLow error
             code = None
@@ -49,22 +135,71 @@ async def transaction_gas_wrapper(
             if not code or code != -32010:
                 raise e
             logger.exception(e)
-            if i < ATTEMPTS_WITH_DEFAULT_GAS - 1:  # skip last sleep
-                await asyncio.sleep(network_config.SECONDS_PER_BLOCK)
+            if i < ATTEMPTS_WITH_DEFAULT_GAS - 1:  # skip last refresh
+                await fee_oracle.refresh_next_block()
 
     # use high priority fee
-    tx_params = tx_params | await gas_manager.get_high_priority_tx_params()
-    return await tx_function.transact(tx_params)
+    tx_params = await fee_oracle.get_tx_params(high_priority=True) | tx_params
+    return await _transact(client, tx_function, tx_params)
+
+
+async def _transact(
+    client: AsyncWeb3, tx_function: AsyncContractFunction, tx_params: TxParams
+) -> HexBytes:
+    nonce_manager = get_nonce_manager(client)
+    async with nonce_manager.use_nonce() as nonce:
+        nonce_tx_params: TxParams = {**tx_params, 'nonce': nonce}
+        tx_hash = await tx_function.transact(nonce_tx_params)
+    nonce_manager.track_transaction(Web3.to_hex(tx_hash), nonce)
+    track_transaction_submitted(Web3.to_hex(tx_hash))
+    return tx_hash
+
+
+async def wait_for_tx_receipt(execution_client: AsyncWeb3, tx_hash: HexStr) -> TxReceipt:
+    """
+    Waits for the transaction receipt.
+    If the transaction was not included in time and was dropped, resyncs the nonce.
+    """
+    nonce_manager = _nonce_managers.get(execution_client)
+    try:
+        tx_receipt = await execution_client.eth.wait_for_transaction_receipt(
+            HexBytes(Web3.to_bytes(hexstr=tx_hash)), timeout=EXECUTION_TRANSACTION_TIMEOUT
+        )
+    except TimeExhausted:
+        track_transaction_receipt(tx_hash, 'timeout')
+        logger.warning('Transaction %s was not included in time', tx_hash)
+        if nonce_manager:
+            await nonce_manager.handle_receipt_timeout(tx_hash)
+        raise
+    if nonce_manager:
+        nonce_manager.confirm_transaction(tx_hash)
+    track_transaction_receipt(tx_hash, 'success' if tx_receipt['status'] else 'reverted')
+    return tx_receipt
 
 
 async def wait_for_tx_confirmation(execution_client: AsyncWeb3, tx_hash: HexStr) -> None:
     """
     Raises exception if tx was not included to block or if tx was reverted.
     """
-    tx_receipt = await execution_client.eth.wait_for_transaction_receipt(
-        HexBytes(Web3.to_bytes(hexstr=tx_hash)), timeout=EXECUTION_TRANSACTION_TIMEOUT
-    )
+    tx_receipt = await wait_for_tx_receipt(execution_client, tx_hash)
     if not tx_receipt['status']:
         raise RuntimeError(
             f'Failed to confirm tx: {tx_hash}',
         )
+
+
+async def wait_for_tx_confirmations(execution_client: AsyncWeb3, tx_hashes: list[HexStr]) -> None:
+    """
+    Waits for several in-flight transactions at once.
+    Raises exception if any tx was not included to block or was reverted.
+    """
+    await asyncio.gather(
+        *(wait_for_tx_confirmation(execution_client, tx_hash) for tx_hash in tx_hashes)
+    )
+
+
+def _is_nonce_error(e: ValueError) -> bool:
+    message = ''
+    if e.args and isinstance(e.args[0], dict):
+        message = str(e.args[0].get('message', ''))
+    return any(error in message.lower() for error in NONCE_ERRORS)
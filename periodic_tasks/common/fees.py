@@ -0,0 +1,160 @@
+import asyncio
+import contextlib
+import logging
+import statistics
+import time
+from dataclasses import dataclass
+
+from web3 import AsyncWeb3, Web3
+from web3.types import BlockNumber, TxParams, Wei
+
+from periodic_tasks.common.settings import (
+    MAX_FEE_PER_GAS,
+    PRIORITY_FEE_NUM_BLOCKS,
+    PRIORITY_FEE_PERCENTILE,
+    network_config,
+)
+
+logger = logging.getLogger(__name__)
+
+# Background refresh stops after this number of blocks without fee requests
+IDLE_BLOCKS = 5
+
+# seconds between block number checks while waiting for the next block
+BLOCK_POLL_INTERVAL = 1
+
+
+@dataclass
+class BlockFees:
+    block_number: BlockNumber
+    # base fee of the next block
+    base_fee: Wei
+    # priority fee suggested by the node
+    priority_fee: Wei
+    # mean of PRIORITY_FEE_PERCENTILE rewards over PRIORITY_FEE_NUM_BLOCKS blocks
+    high_priority_fee: Wei
+    updated_at: float
+
+
+class FeeOracle:
+    """
+    Caches fee data of the latest block and hands out EIP-1559 transaction params.
+    Fees are refreshed in the background once per block while the oracle is in use,
+    so bursts of transactions share a single `eth_feeHistory` call.
+    The refresh stops after IDLE_BLOCKS blocks without fee requests.
+    Max fee is capped by MAX_FEE_PER_GAS, but never below the fee required by the next block.
+    """
+
+    def __init__(self, client: AsyncWeb3):
+        self.client = client
+        self._fees: BlockFees | None = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+        self._last_used_at = 0.0
+
+    async def get_tx_params(self, high_priority: bool = False) -> TxParams:
+        fees = await self._get_fees()
+        priority_fee = fees.priority_fee
+        if high_priority:
+            priority_fee = Wei(max(fees.high_priority_fee, priority_fee))
+
+        # same formula as web3 default, leaves room for base fee growth in the next blocks
+        max_fee_per_gas = Wei(2 * fees.base_fee + priority_fee)
+        if max_fee_per_gas > MAX_FEE_PER_GAS:
+            # transactions below the base fee can not be included
+            min_fee_per_gas = Wei(fees.base_fee + priority_fee)
+            if min_fee_per_gas > MAX_FEE_PER_GAS:
+                logger.warning(
+                    'Base fee %s Gwei exceeds MAX_FEE_PER_GAS_GWEI',
+                    Web3.from_wei(fees.base_fee, 'gwei'),
+                )
+            max_fee_per_gas = max(MAX_FEE_PER_GAS, min_fee_per_gas)
+
+        return {
+            'maxFeePerGas': max_fee_per_gas,
+            'maxPriorityFeePerGas': priority_fee,
+        }
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            self._fees = await self._fetch_fees()
+
+    async def refresh_next_block(self) -> None:
+        """
+        Refreshes fees once a block after the cached one is produced,
+        so that retries do not reuse the fees of the same block.
+        Waits for two block intervals at most.
+        """
+        if self._fees is not None:
+            block_number = self._fees.block_number
+            deadline = time.monotonic() + 2 * network_config.SECONDS_PER_BLOCK
+            while (
+                await self.client.eth.get_block_number() <= block_number
+                and time.monotonic() < deadline
+            ):
+                await asyncio.sleep(BLOCK_POLL_INTERVAL)
+        await self.refresh()
+
+    async def stop(self) -> None:
+        """Stops the background refresh."""
+        if self._refresh_task is None:
+            return
+        self._refresh_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._refresh_task
+
+    async def _get_fees(self) -> BlockFees:
+        self._last_used_at = time.monotonic()
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+        async with self._lock:
+            if self._fees is None or self._is_stale(self._fees):
+                self._fees = await self._fetch_fees()
+                logger.debug('Fees updated at block %d', self._fees.block_number)
+            return self._fees
+
+    async def _refresh_loop(self) -> None:
+        while not self._is_idle():
+            await asyncio.sleep(network_config.SECONDS_PER_BLOCK)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # fees are fetched again on demand
+                logger.warning('Failed to refresh fees: %s', e)
+
+    async def _fetch_fees(self) -> BlockFees:
+        fee_history, priority_fee = await asyncio.gather(
+            self.client.eth.fee_history(
+                PRIORITY_FEE_NUM_BLOCKS, 'latest', [PRIORITY_FEE_PERCENTILE]
+            ),
+            self.client.eth.max_priority_fee,
+        )
+        rewards = [reward[0] for reward in fee_history['reward'] if reward]
+        return BlockFees(
+            block_number=BlockNumber(
+                fee_history['oldestBlock'] + len(fee_history['baseFeePerGas']) - 2
+            ),
+            base_fee=Wei(fee_history['baseFeePerGas'][-1]),
+            priority_fee=priority_fee,
+            high_priority_fee=Wei(int(statistics.mean(rewards))) if rewards else Wei(0),
+            updated_at=time.monotonic(),
+        )
+
+    def _is_idle(self) -> bool:
+        idle_time = time.monotonic() - self._last_used_at
+        return idle_time > IDLE_BLOCKS * network_config.SECONDS_PER_BLOCK
+
+    @staticmethod
+    def _is_stale(fees: BlockFees) -> bool:
+        return time.monotonic() - fees.updated_at > network_config.SECONDS_PER_BLOCK
+
+
+_fee_oracles: dict[AsyncWeb3, FeeOracle] = {}
+
+
+def get_fee_oracle(client: AsyncWeb3) -> FeeOracle:
+    """Returns fee oracle shared by all transaction senders of the client."""
+    if client not in _fee_oracles:
+        _fee_oracles[client] = FeeOracle(client)
+    return _fee_oracles[client]
@@ -1,10 +1,18 @@
+import asyncio
 import logging
 
 from eth_typing import BlockNumber, ChecksumAddress
 from gql import gql
+from graphql import DocumentNode
 from sw_utils.graph.client import GraphClient
 
+from periodic_tasks.common.settings import (
+    GRAPH_IN_FILTER_CHUNK_SIZE,
+    GRAPH_IN_FILTER_CONCURRENCY,
+    GRAPH_PAGE_SIZE,
+)
 from periodic_tasks.common.typings import Vault
+from periodic_tasks.common.utils import chunkify
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +25,7 @@ async def graph_get_vaults(
     """
     Returns mapping from vault address to Vault object
     """
-    where_conditions: list[str] = []
+    where_conditions: list[str] = ['id_gt: $lastId']
     params: dict = {}
 
     if vaults == []:
@@ -32,17 +40,15 @@ async def graph_get_vaults(
         params['isMetaVault'] = is_meta_vault
 
     where_conditions_str = '\n'.join(where_conditions)
-    where_clause = f'where: {{ {where_conditions_str} }}' if where_conditions else ''
-
-    filters = ['first: $first', 'skip: $skip']
-
-    if where_clause:
-        filters.append(where_clause)
 
     query = f"""
-        query VaultQuery($first: Int, $skip: Int, $vaults: [String], $isMetaVault: Boolean) {{
+        query VaultQuery(
+            $first: Int, $lastId: String, $vaults: [String], $isMetaVault: Boolean
+        ) {{
             vaults(
-                {', '.join(filters)}
+                first: $first,
+                orderBy: id,
+                where: {{ {where_conditions_str} }}
             ) {{
                 id
                 isMetaVault
@@ -58,7 +64,7 @@ async def graph_get_vaults(
         }}
         """
 
-    response = await graph_client.fetch_pages(gql(query), params)
+    response = await fetch_pages_by_id(graph_client, gql(query), params)
 
     graph_vaults_map: dict[ChecksumAddress, Vault] = {}
 
@@ -69,6 +75,57 @@ async def graph_get_vaults(
     return graph_vaults_map
 
 
+async def fetch_pages_by_id(
+    graph_client: GraphClient,
+    query: DocumentNode,
+    params: dict | None = None,
+    page_size: int = GRAPH_PAGE_SIZE,
+) -> list[dict]:
+    """
+    Fetches all pages of a query using keyset pagination.
+    The query must take `$first` and `$lastId` variables, order by `id`
+    and filter by `id_gt: $lastId`. Pass `block` in params to pin all pages to one block.
+    Unlike `skip` pagination, cost of a page does not grow with its offset.
+    """
+    result: list[dict] = []
+    last_id = ''
+    while True:
+        page_params = (params or {}) | {'first': page_size, 'lastId': last_id}
+        response = await graph_client.run_query(query, page_params)
+        # query has a single root field
+        page = next(iter(response.values()))
+        result.extend(page)
+        if len(page) < page_size:
+            return result
+        last_id = page[-1]['id']
+
+
+# pylint: disable-next=too-many-arguments
+async def fetch_pages_by_id_chunked(
+    graph_client: GraphClient,
+    query: DocumentNode,
+    params: dict,
+    in_filter_param: str,
+    chunk_size: int = GRAPH_IN_FILTER_CHUNK_SIZE,
+    concurrency: int = GRAPH_IN_FILTER_CONCURRENCY,
+) -> list[dict]:
+    """
+    Same as `fetch_pages_by_id` but splits the list in `params[in_filter_param]`
+    into chunks fetched concurrently. Results are merged in chunks order,
+    callers sort them when order matters.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _fetch_chunk(chunk: list) -> list[dict]:
+        async with semaphore:
+            return await fetch_pages_by_id(graph_client, query, params | {in_filter_param: chunk})
+
+    chunks_results = await asyncio.gather(
+        *(_fetch_chunk(list(chunk)) for chunk in chunkify(params[in_filter_param], chunk_size))
+    )
+    return [item for chunk_result in chunks_results for item in chunk_result]
+
+
 async def graph_get_latest_block(graph_client: GraphClient) -> BlockNumber:
     """
     Returns the last synced block number of the graph node.
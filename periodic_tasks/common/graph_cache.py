@@ -0,0 +1,155 @@
+import asyncio
+import functools
+import itertools
+import json
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from graphql import DocumentNode, FieldNode, OperationDefinitionNode, print_ast
+
+from periodic_tasks.common.instrumentation import InstrumentedGraphClient
+from periodic_tasks.common.settings import GRAPH_CACHE_SIZE, GRAPH_CACHE_TTL
+from periodic_tasks.common.typings import CacheStats
+
+logger = logging.getLogger(__name__)
+
+# scope, query source, variables
+CacheKey = tuple[int, str, str]
+
+# responses are cached per run, see `graph_cache_scope`
+_cache_scope: ContextVar[int] = ContextVar('graph_cache_scope', default=0)
+_cache_scope_ids = itertools.count(1)
+
+_graph_clients: weakref.WeakSet['CachedGraphClient'] = weakref.WeakSet()
+
+
+class CachedGraphClient(InstrumentedGraphClient):
+    """
+    Caches subgraph responses keyed by query and variables.
+    Responses are cached per `graph_cache_scope`.
+    Responses of queries pinned to a block do not change and are kept until the scope exits,
+    the number of them is bounded by GRAPH_CACHE_SIZE.
+    Responses of unpinned queries are kept for GRAPH_CACHE_TTL seconds.
+    Concurrent identical queries share a single request.
+    `_meta` queries report the sync status of the graph node and are never cached.
+    Cached responses are shared between callers and must not be modified.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._pinned_responses: OrderedDict[CacheKey, dict] = OrderedDict()
+        self._unpinned_responses: dict[CacheKey, tuple[float, dict]] = {}
+        self._in_flight: dict[CacheKey, asyncio.Task] = {}
+        self.stats = CacheStats()
+        _graph_clients.add(self)
+
+    async def run_query(self, query: DocumentNode, params: dict | None = None) -> dict:
+        if _is_meta_query(query):
+            return await super().run_query(query, params)
+
+        key = _get_cache_key(query, params)
+        is_pinned = bool(params and params.get('block') is not None)
+
+        cached_response = self._get_cached(key, is_pinned)
+        if cached_response is not None:
+            self.stats.hits += 1
+            return cached_response
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.stats.hits += 1
+            # shield the shared request from cancellation of a single caller
+            return await asyncio.shield(task)
+
+        self.stats.misses += 1
+        task = asyncio.ensure_future(super().run_query(query, params))
+        task.add_done_callback(functools.partial(self._on_request_done, key))
+        self._in_flight[key] = task
+        response = await asyncio.shield(task)
+
+        self._set_cached(key, is_pinned, response)
+        return response
+
+    def clear_cache(self, scope: int | None = None) -> None:
+        """Drops cached responses of the scope, or all of them if the scope is not given."""
+        if scope is None:
+            self._pinned_responses.clear()
+            self._unpinned_responses.clear()
+            return
+        for key in [key for key in self._pinned_responses if key[0] == scope]:
+            del self._pinned_responses[key]
+        for key in [key for key in self._unpinned_responses if key[0] == scope]:
+            del self._unpinned_responses[key]
+
+    def _on_request_done(self, key: CacheKey, task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        if not task.cancelled():
+            # mark the error as retrieved in case all callers were cancelled
+            task.exception()
+
+    def _get_cached(self, key: CacheKey, is_pinned: bool) -> dict | None:
+        if is_pinned:
+            response = self._pinned_responses.get(key)
+            if response is not None:
+                self._pinned_responses.move_to_end(key)
+            return response
+
+        cached = self._unpinned_responses.get(key)
+        if cached is None:
+            return None
+        expires_at, response = cached
+        if expires_at < time.monotonic():
+            del self._unpinned_responses[key]
+            return None
+        return response
+
+    def _set_cached(self, key: CacheKey, is_pinned: bool, response: dict) -> None:
+        if is_pinned:
+            self._pinned_responses[key] = response
+            if len(self._pinned_responses) > GRAPH_CACHE_SIZE:
+                self._pinned_responses.popitem(last=False)
+        elif GRAPH_CACHE_TTL:
+            self._unpinned_responses[key] = (time.monotonic() + GRAPH_CACHE_TTL, response)
+
+
+@contextmanager
+def graph_cache_scope() -> Iterator[None]:
+    """
+    Keeps subgraph responses cached within a single run.
+    Concurrent runs get separate scopes, so that one run does not drop the responses of another.
+    """
+    scope = next(_cache_scope_ids)
+    token = _cache_scope.set(scope)
+    try:
+        yield
+    finally:
+        _cache_scope.reset(token)
+        for graph_client in _graph_clients:
+            logger.debug(
+                'Graph cache hit rate: %.2f (%d hits, %d misses)',
+                graph_client.stats.hit_rate,
+                graph_client.stats.hits,
+                graph_client.stats.misses,
+            )
+            graph_client.clear_cache(scope)
+
+
+def _is_meta_query(query: DocumentNode) -> bool:
+    for definition in query.definitions:
+        if not isinstance(definition, OperationDefinitionNode):
+            continue
+        for selection in definition.selection_set.selections:
+            if isinstance(selection, FieldNode) and selection.name.value == '_meta':
+                return True
+    return False
+
+
+def _get_cache_key(query: DocumentNode, params: dict | None) -> CacheKey:
+    # queries are built per call, compare them by source
+    source = query.loc.source.body if query.loc else print_ast(query)
+    return _cache_scope.get(), source, json.dumps(params or {}, sort_keys=True, default=str)
@@ -4,8 +4,7 @@ because update-price script does not use graph client
 """
 import logging
 
-from sw_utils.graph.client import GraphClient
-
+from periodic_tasks.common.graph_cache import CachedGraphClient
 from periodic_tasks.common.settings import GRAPH_PAGE_SIZE
 
 from .settings import GRAPH_API_RETRY_TIMEOUT, GRAPH_API_TIMEOUT, GRAPH_API_URL
@@ -17,7 +16,7 @@ if not GRAPH_API_URL:
     raise ValueError('Set GRAPH_API_URL environment variable')
 
 
-graph_client = GraphClient(
+graph_client = CachedGraphClient(
     endpoint=GRAPH_API_URL,
     request_timeout=GRAPH_API_TIMEOUT,
     retry_timeout=GRAPH_API_RETRY_TIMEOUT,
@@ -0,0 +1,136 @@
+"""
+Prometheus instrumentation shared by all tasks:
+subgraph queries, execution RPC requests and transactions.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+from eth_typing import HexStr
+from graphql import DocumentNode
+from prometheus_client import Counter, Histogram
+from sw_utils.graph.client import GraphClient
+from web3 import AsyncWeb3
+from web3.types import AsyncMiddlewareCoroutine, RPCEndpoint, RPCResponse
+
+logger = logging.getLogger(__name__)
+
+# Name of the task being run, used to label transaction metrics
+current_task: ContextVar[str] = ContextVar('current_task', default='unknown')
+
+graph_query_duration = Histogram(
+    'graph_query_duration_seconds',
+    'Subgraph query duration',
+    labelnames=['query', 'operation'],
+)
+graph_queries = Counter(
+    'graph_queries',
+    'Subgraph queries',
+    labelnames=['query', 'operation', 'status'],
+)
+
+rpc_request_duration = Histogram(
+    'rpc_request_duration_seconds',
+    'Execution RPC request duration',
+    labelnames=['method'],
+)
+rpc_requests = Counter(
+    'rpc_requests',
+    'Execution RPC requests',
+    labelnames=['method', 'status'],
+)
+
+transaction_duration = Histogram(
+    'transaction_duration_seconds',
+    'Time from transaction submission to receipt',
+    labelnames=['task'],
+    buckets=(1, 5, 10, 15, 30, 60, 120, 300, 600),
+)
+transactions = Counter(
+    'transactions',
+    'Submitted transactions by receipt status',
+    labelnames=['task', 'status'],
+)
+
+# Transactions without receipt are forgotten after this time, in seconds
+SUBMITTED_TRANSACTION_MAX_AGE = 60 * 60
+
+# tx hash -> (task, submission time), in submission order
+_submitted_transactions: dict[HexStr, tuple[str, float]] = {}
+
+
+class InstrumentedGraphClient(GraphClient):
+    """Records duration and status of subgraph queries by query name."""
+
+    async def run_query(self, query: DocumentNode, params: dict | None = None) -> dict:
+        with _track_graph_query(query, 'run_query'):
+            return await super().run_query(query, params)
+
+    async def fetch_pages(self, query: DocumentNode, *args: Any, **kwargs: Any) -> list[dict]:
+        with _track_graph_query(query, 'fetch_pages'):
+            return await super().fetch_pages(query, *args, **kwargs)
+
+
+@contextmanager
+def _track_graph_query(query: DocumentNode, operation: str) -> Iterator[None]:
+    query_name = get_query_name(query)
+    start_time = time.perf_counter()
+    status = 'error'
+    try:
+        yield
+        status = 'success'
+    finally:
+        graph_query_duration.labels(query=query_name, operation=operation).observe(
+            time.perf_counter() - start_time
+        )
+        graph_queries.labels(query=query_name, operation=operation, status=status).inc()
+
+
+def get_query_name(query: DocumentNode) -> str:
+    for definition in query.definitions:
+        name = getattr(definition, 'name', None)
+        if name:
+            return name.value
+    return 'unknown'
+
+
+async def rpc_instrumentation_middleware(
+    make_request: Callable[[RPCEndpoint, Any], Any], _w3: AsyncWeb3
+) -> AsyncMiddlewareCoroutine:
+    """Web3 middleware recording duration and status of execution RPC requests by method."""
+
+    async def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+        start_time = time.perf_counter()
+        status = 'error'
+        try:
+            response = await make_request(method, params)
+            if 'error' not in response:
+                status = 'success'
+            return response
+        finally:
+            rpc_request_duration.labels(method=method).observe(time.perf_counter() - start_time)
+            rpc_requests.labels(method=method, status=status).inc()
+
+    return middleware
+
+
+def track_transaction_submitted(tx_hash: HexStr) -> None:
+    submit_time = time.perf_counter()
+    # drop transactions that are never waited for
+    for old_tx_hash, (_, old_submit_time) in list(_submitted_transactions.items()):
+        if submit_time - old_submit_time < SUBMITTED_TRANSACTION_MAX_AGE:
+            break
+        del _submitted_transactions[old_tx_hash]
+    _submitted_transactions[tx_hash] = (current_task.get(), submit_time)
+
+
+def track_transaction_receipt(tx_hash: HexStr, status: str) -> None:
+    """Records submit-to-receipt time for transactions submitted by this process."""
+    submitted = _submitted_transactions.pop(tx_hash, None)
+    if submitted is None:
+        return
+    task, submit_time = submitted
+    transaction_duration.labels(task=task).observe(time.perf_counter() - submit_time)
+    transactions.labels(task=task, status=status).inc()
@@ -12,16 +12,38 @@ GRAPH_API_URL: str = config('GRAPH_API_URL', default='')
 GRAPH_API_TIMEOUT: int = config('GRAPH_API_TIMEOUT', default='10', cast=int)
 GRAPH_API_RETRY_TIMEOUT: int = config('GRAPH_API_RETRY_TIMEOUT', default='60', cast=int)
 GRAPH_PAGE_SIZE: int = config('GRAPH_PAGE_SIZE', default=100, cast=int)
+# Long `_in` filters are split into chunks fetched concurrently
+GRAPH_IN_FILTER_CHUNK_SIZE: int = config('GRAPH_IN_FILTER_CHUNK_SIZE', default=500, cast=int)
+GRAPH_IN_FILTER_CONCURRENCY: int = config('GRAPH_IN_FILTER_CONCURRENCY', default=4, cast=int)
+# Max number of cached responses of block-pinned queries
+GRAPH_CACHE_SIZE: int = config('GRAPH_CACHE_SIZE', default=1000, cast=int)
+# Seconds to cache responses of queries not pinned to a block, 0 disables the cache
+GRAPH_CACHE_TTL: int = config('GRAPH_CACHE_TTL', default=5, cast=int)
 
 
 EXECUTION_TRANSACTION_TIMEOUT: int = config('EXECUTION_TRANSACTION_TIMEOUT', default=300, cast=int)
 
+# Max number of calls packed into a single multicall eth_call
+MULTICALL_BATCH_SIZE: int = config('MULTICALL_BATCH_SIZE', default=100, cast=int)
+
 SENTRY_DSN: str = config('SENTRY_DSN', default='')
 
+# Directory for the checkpoint store shared between runs, in-memory store if not set
+DATA_DIR: str = config('DATA_DIR', default='')
+
 # Prometheus
 METRICS_HOST: str = config('METRICS_HOST', default='127.0.0.1')
 METRICS_PORT: int = config('METRICS_PORT', default=9100, cast=int)
+# separate from METRICS_PORT, so that the daemon and metrics.py can run on the same host
+DAEMON_METRICS_PORT: int = config('DAEMON_METRICS_PORT', default=9101, cast=int)
 METRICS_REFRESH_INTERNAL: int = config('METRICS_REFRESH_INTERNAL', default=60 * 5, cast=int)
+METRICS_COLLECTOR_TIMEOUT: int = config('METRICS_COLLECTOR_TIMEOUT', default=60 * 2, cast=int)
+
+# Daemon: task intervals in seconds, 0 disables the task
+FORCE_EXITS_INTERVAL: int = config('FORCE_EXITS_INTERVAL', default=0, cast=int)
+UPDATE_LTV_INTERVAL: int = config('UPDATE_LTV_INTERVAL', default=0, cast=int)
+META_VAULTS_INTERVAL: int = config('META_VAULTS_INTERVAL', default=0, cast=int)
+UPDATE_PRICE_INTERVAL: int = config('UPDATE_PRICE_INTERVAL', default=0, cast=int)
 
 # gas settings
 ATTEMPTS_WITH_DEFAULT_GAS: int = config('ATTEMPTS_WITH_DEFAULT_GAS', default=3, cast=int)
@@ -38,3 +60,10 @@ EVENTS_BLOCKS_RANGE_INTERVAL = config(
     default=43200 // network_config.SECONDS_PER_BLOCK,  # 12 hrs
     cast=int,
 )
+# Number of log windows fetched concurrently when searching for the last event
+EVENTS_CONCURRENCY: int = config('EVENTS_CONCURRENCY', default=4, cast=int)
+# Bounds for the adaptive log window size
+EVENTS_MIN_BLOCKS_RANGE: int = config('EVENTS_MIN_BLOCKS_RANGE', default=100, cast=int)
+EVENTS_MAX_BLOCKS_RANGE: int = config(
+    'EVENTS_MAX_BLOCKS_RANGE', default=EVENTS_BLOCKS_RANGE_INTERVAL * 16, cast=int
+)
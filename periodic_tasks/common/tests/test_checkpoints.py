@@ -0,0 +1,28 @@
+from unittest import mock
+
+from periodic_tasks.common.checkpoints import CheckpointStore
+
+
+class TestCheckpointStore:
+    def test_get_set(self):
+        store = CheckpointStore(':memory:')
+
+        assert store.get('block') is None
+
+        store.set('block', 100)
+        store.set('block', 200)
+        store.set('addresses', ['0x1', '0x2'])
+
+        assert store.get('block') == 200
+        assert store.get('addresses') == ['0x1', '0x2']
+
+    def test_max_age(self):
+        store = CheckpointStore(':memory:')
+
+        with mock.patch('periodic_tasks.common.checkpoints.time.time', return_value=1000):
+            store.set('owner', '0x1')
+
+        with mock.patch('periodic_tasks.common.checkpoints.time.time', return_value=1050):
+            assert store.get('owner', max_age=100) == '0x1'
+            assert store.get('owner', max_age=10) is None
+            assert store.get('owner') == '0x1'
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from sw_utils.tests import faker
+
+from periodic_tasks.common.clients import get_execution_client
+from periodic_tasks.common.contracts import ContractRegistry
+
+ABI_PATH = Path(__file__).parents[1] / 'abi' / 'IKeeper.json'
+
+
+class TestContractRegistry:
+    def test_abi_parsed_once(self):
+        registry = ContractRegistry()
+
+        abi_0 = registry.get_abi(ABI_PATH)
+        abi_1 = registry.get_abi(ABI_PATH)
+
+        assert abi_0 is abi_1
+        assert registry.abi_stats.misses == 1
+        assert registry.abi_stats.hits == 1
+        assert registry.abi_stats.hit_rate == 0.5
+
+    def test_contract_reused(self):
+        registry = ContractRegistry()
+        client = get_execution_client('http://localhost')
+        address = faker.eth_address()
+
+        contract_0 = registry.get_contract(ABI_PATH, address, client)
+        contract_1 = registry.get_contract(ABI_PATH, address, client)
+        contract_2 = registry.get_contract(ABI_PATH, faker.eth_address(), client)
+        contract_3 = registry.get_contract(ABI_PATH, address, get_execution_client('http://other'))
+
+        assert contract_0 is contract_1
+        assert contract_0 is not contract_2
+        assert contract_0 is not contract_3
+        assert registry.contract_stats.hits == 1
+        assert registry.contract_stats.misses == 3
+        assert registry.abi_stats.misses == 1
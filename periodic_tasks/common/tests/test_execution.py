@@ -0,0 +1,60 @@
+from unittest import mock
+
+from sw_utils.tests import faker
+from web3.exceptions import TransactionNotFound
+from web3.types import Nonce
+
+from periodic_tasks.common.execution import NonceManager
+
+
+def create_nonce_manager() -> NonceManager:
+    client = mock.Mock()
+    client.eth.get_transaction_count = mock.AsyncMock(return_value=Nonce(10))
+    client.eth.get_transaction = mock.AsyncMock(side_effect=TransactionNotFound())
+    return NonceManager(client=client, address=faker.eth_address())
+
+
+async def send_transaction(nonce_manager: NonceManager) -> str:
+    tx_hash = faker.eth_address()
+    async with nonce_manager.use_nonce() as nonce:
+        nonce_manager.track_transaction(tx_hash, nonce)
+    return tx_hash
+
+
+class TestNonceManager:
+    async def test_dropped_transaction(self):
+        nonce_manager = create_nonce_manager()
+        get_transaction_count = nonce_manager.client.eth.get_transaction_count
+        tx_hash_1 = await send_transaction(nonce_manager)
+        tx_hash_2 = await send_transaction(nonce_manager)
+
+        # the other transaction can still be mined, its nonce must not be reused
+        await nonce_manager.handle_receipt_timeout(tx_hash_1)
+        await send_transaction(nonce_manager)
+        get_transaction_count.assert_called_with(nonce_manager.address, 'pending')
+
+        nonce_manager.confirm_transaction(tx_hash_2)
+        tx_hash_3 = await send_transaction(nonce_manager)
+        await nonce_manager.handle_receipt_timeout(tx_hash_3)
+        await send_transaction(nonce_manager)
+        get_transaction_count.assert_called_with(nonce_manager.address, 'latest')
+
+    async def test_pending_transaction_keeps_nonce(self):
+        nonce_manager = create_nonce_manager()
+        nonce_manager.client.eth.get_transaction.configure_mock(side_effect=None)
+        tx_hash = await send_transaction(nonce_manager)
+
+        await nonce_manager.handle_receipt_timeout(tx_hash)
+        async with nonce_manager.use_nonce() as nonce:
+            assert nonce == 11
+
+        assert nonce_manager.client.eth.get_transaction_count.call_count == 1
+
+    async def test_mined_transactions_forgotten(self):
+        nonce_manager = create_nonce_manager()
+        tx_hashes = [await send_transaction(nonce_manager) for _ in range(3)]
+
+        # receipts of the first transactions are never awaited
+        nonce_manager.confirm_transaction(tx_hashes[1])
+
+        assert nonce_manager._unconfirmed == {tx_hashes[2]: 12}
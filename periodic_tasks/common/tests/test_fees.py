@@ -0,0 +1,95 @@
+import asyncio
+import time
+from unittest import mock
+
+import pytest
+from web3 import Web3
+from web3.types import BlockNumber
+
+from periodic_tasks.common.fees import BlockFees, FeeOracle
+
+
+def create_block_fees(base_fee_gwei: int, priority_fee_gwei: int, high_priority_fee_gwei: int):
+    return BlockFees(
+        block_number=BlockNumber(1),
+        base_fee=Web3.to_wei(base_fee_gwei, 'gwei'),
+        priority_fee=Web3.to_wei(priority_fee_gwei, 'gwei'),
+        high_priority_fee=Web3.to_wei(high_priority_fee_gwei, 'gwei'),
+        updated_at=time.monotonic(),
+    )
+
+
+@pytest.fixture
+async def fee_oracle():
+    fee_oracle = FeeOracle(mock.Mock())
+    yield fee_oracle
+    await fee_oracle.stop()
+
+
+class TestFeeOracle:
+    async def test_tx_params(self, fee_oracle):
+        fees = create_block_fees(base_fee_gwei=10, priority_fee_gwei=1, high_priority_fee_gwei=3)
+
+        with mock.patch.object(FeeOracle, '_fetch_fees', return_value=fees):
+            assert await fee_oracle.get_tx_params() == {
+                'maxFeePerGas': Web3.to_wei(21, 'gwei'),
+                'maxPriorityFeePerGas': Web3.to_wei(1, 'gwei'),
+            }
+            assert await fee_oracle.get_tx_params(high_priority=True) == {
+                'maxFeePerGas': Web3.to_wei(23, 'gwei'),
+                'maxPriorityFeePerGas': Web3.to_wei(3, 'gwei'),
+            }
+
+    async def test_max_fee_capped(self, fee_oracle):
+        fees = create_block_fees(base_fee_gwei=60, priority_fee_gwei=1, high_priority_fee_gwei=3)
+
+        with mock.patch.object(FeeOracle, '_fetch_fees', return_value=fees), mock.patch(
+            'periodic_tasks.common.fees.MAX_FEE_PER_GAS', Web3.to_wei(100, 'gwei')
+        ):
+            tx_params = await fee_oracle.get_tx_params()
+
+        assert tx_params['maxFeePerGas'] == Web3.to_wei(100, 'gwei')
+
+    async def test_max_fee_not_below_base_fee(self, fee_oracle):
+        fees = create_block_fees(base_fee_gwei=1000, priority_fee_gwei=1, high_priority_fee_gwei=3)
+
+        with mock.patch.object(FeeOracle, '_fetch_fees', return_value=fees), mock.patch(
+            'periodic_tasks.common.fees.MAX_FEE_PER_GAS', Web3.to_wei(100, 'gwei')
+        ):
+            tx_params = await fee_oracle.get_tx_params()
+
+        assert tx_params['maxFeePerGas'] == Web3.to_wei(1001, 'gwei')
+
+    async def test_fees_shared(self, fee_oracle):
+        fees = create_block_fees(base_fee_gwei=10, priority_fee_gwei=1, high_priority_fee_gwei=3)
+
+        with mock.patch.object(FeeOracle, '_fetch_fees', return_value=fees) as fetch_fees_mock:
+            await asyncio.gather(*[fee_oracle.get_tx_params() for _ in range(10)])
+
+            assert fetch_fees_mock.call_count == 1
+
+            await fee_oracle.refresh()
+            assert fetch_fees_mock.call_count == 2
+
+    async def test_refresh_stops_when_idle(self, fee_oracle):
+        fees = create_block_fees(base_fee_gwei=10, priority_fee_gwei=1, high_priority_fee_gwei=3)
+
+        with mock.patch.object(FeeOracle, '_fetch_fees', return_value=fees):
+            await fee_oracle.get_tx_params()
+        assert not fee_oracle._is_idle()
+
+        fee_oracle._last_used_at = time.monotonic() - 3600
+        await asyncio.wait_for(fee_oracle._refresh_loop(), timeout=1)
+
+    async def test_refresh_next_block(self, fee_oracle):
+        fees = create_block_fees(base_fee_gwei=10, priority_fee_gwei=1, high_priority_fee_gwei=3)
+        fee_oracle.client.eth.get_block_number = mock.AsyncMock(side_effect=[1, 1, 2])
+
+        with mock.patch.object(
+            FeeOracle, '_fetch_fees', return_value=fees
+        ) as fetch_fees_mock, mock.patch('periodic_tasks.common.fees.BLOCK_POLL_INTERVAL', 0):
+            await fee_oracle.get_tx_params()
+            await fee_oracle.refresh_next_block()
+
+        assert fee_oracle.client.eth.get_block_number.call_count == 3
+        assert fetch_fees_mock.call_count == 2
@@ -0,0 +1,53 @@
+from unittest import mock
+
+from gql import gql
+
+from periodic_tasks.common.graph import fetch_pages_by_id, fetch_pages_by_id_chunked
+
+QUERY = gql(
+    '''
+    query VaultQuery($block: Int, $first: Int, $lastId: String) {
+      vaults(block: { number: $block }, where: { id_gt: $lastId }, orderBy: id, first: $first) {
+        id
+      }
+    }
+    '''
+)
+
+
+async def test_fetch_pages_by_id():
+    ids = [f'{i:02}' for i in range(5)]
+
+    async def run_query(_query, params):
+        page = [{'id': i} for i in ids if i > params['lastId']]
+        return {'vaults': page[: params['first']]}
+
+    graph_client = mock.Mock(run_query=mock.AsyncMock(side_effect=run_query))
+
+    result = await fetch_pages_by_id(graph_client, QUERY, {'block': 123}, page_size=2)
+
+    assert [item['id'] for item in result] == ids
+    assert [call.args[1] for call in graph_client.run_query.call_args_list] == [
+        {'block': 123, 'first': 2, 'lastId': ''},
+        {'block': 123, 'first': 2, 'lastId': '01'},
+        {'block': 123, 'first': 2, 'lastId': '03'},
+    ]
+
+
+async def test_fetch_pages_by_id_chunked():
+    async def run_query(_query, params):
+        return {'vaults': [{'id': i} for i in params['vaults'] if i > params['lastId']]}
+
+    graph_client = mock.Mock(run_query=mock.AsyncMock(side_effect=run_query))
+    vaults = [f'{i:02}' for i in range(5)]
+
+    result = await fetch_pages_by_id_chunked(
+        graph_client, QUERY, {'vaults': vaults}, 'vaults', chunk_size=2
+    )
+
+    assert [item['id'] for item in result] == vaults
+    assert [call.args[1]['vaults'] for call in graph_client.run_query.call_args_list] == [
+        ['00', '01'],
+        ['02', '03'],
+        ['04'],
+    ]
@@ -0,0 +1,90 @@
+import asyncio
+from unittest import mock
+
+from gql import gql
+
+from periodic_tasks.common.graph_cache import CachedGraphClient, graph_cache_scope
+from periodic_tasks.common.instrumentation import InstrumentedGraphClient
+
+QUERY = '''
+    query VaultQuery($block: Int) {
+      vaults(block: { number: $block }) {
+        id
+      }
+    }
+'''
+
+
+def create_graph_client() -> CachedGraphClient:
+    return CachedGraphClient(
+        endpoint='http://localhost', request_timeout=10, retry_timeout=60, page_size=100
+    )
+
+
+class TestCachedGraphClient:
+    async def test_pinned_query_cached(self):
+        graph_client = create_graph_client()
+
+        with mock.patch.object(
+            InstrumentedGraphClient, 'run_query', return_value={'vaults': []}
+        ) as run_query_mock:
+            # queries are compared by source, not by identity
+            await graph_client.run_query(gql(QUERY), {'block': 1})
+            await graph_client.run_query(gql(QUERY), {'block': 1})
+            await graph_client.run_query(gql(QUERY), {'block': 2})
+
+            assert run_query_mock.call_count == 2
+
+            graph_client.clear_cache()
+            await graph_client.run_query(gql(QUERY), {'block': 1})
+
+            assert run_query_mock.call_count == 3
+
+    async def test_in_flight_deduplicated(self):
+        graph_client = create_graph_client()
+
+        async def run_query(*_args, **_kwargs):
+            await asyncio.sleep(0.01)
+            return {'vaults': []}
+
+        with mock.patch.object(
+            InstrumentedGraphClient, 'run_query', side_effect=run_query
+        ) as run_query_mock:
+            responses = await asyncio.gather(
+                *(graph_client.run_query(gql(QUERY), {'block': None}) for _ in range(3))
+            )
+
+        assert run_query_mock.call_count == 1
+        assert responses == [{'vaults': []}] * 3
+        assert graph_client.stats.misses == 1
+        assert graph_client.stats.hits == 2
+
+    async def test_meta_query_not_cached(self):
+        graph_client = create_graph_client()
+        query = gql('query Meta { _meta { block { number } } }')
+
+        with mock.patch.object(
+            InstrumentedGraphClient, 'run_query', return_value={'_meta': {'block': {'number': 1}}}
+        ) as run_query_mock:
+            await graph_client.run_query(query)
+            await graph_client.run_query(query)
+
+        assert run_query_mock.call_count == 2
+
+    async def test_scopes_separated(self):
+        graph_client = create_graph_client()
+
+        with mock.patch.object(
+            InstrumentedGraphClient, 'run_query', return_value={'vaults': []}
+        ) as run_query_mock:
+            with graph_cache_scope():
+                await graph_client.run_query(gql(QUERY), {'block': 1})
+
+                # concurrent run in another scope exits
+                with graph_cache_scope():
+                    await graph_client.run_query(gql(QUERY), {'block': 1})
+
+                await graph_client.run_query(gql(QUERY), {'block': 1})
+
+            assert run_query_mock.call_count == 2
+            assert not graph_client._pinned_responses
@@ -0,0 +1,38 @@
+from gql import gql
+from sw_utils.tests import faker
+
+from periodic_tasks.common.instrumentation import (
+    current_task,
+    get_query_name,
+    track_transaction_receipt,
+    track_transaction_submitted,
+    transactions,
+)
+
+
+def test_get_query_name():
+    query = gql(
+        '''
+        query VaultsQuery($first: Int) {
+          vaults(first: $first) {
+            id
+          }
+        }
+        '''
+    )
+    assert get_query_name(query) == 'VaultsQuery'
+    assert get_query_name(gql('{ vaults { id } }')) == 'unknown'
+
+
+def test_track_transaction():
+    tx_hash = faker.eth_address()
+    current_task.set('test_task')
+    counter = transactions.labels(task='test_task', status='success')
+    count_before = counter._value.get()
+
+    track_transaction_submitted(tx_hash)
+    track_transaction_receipt(tx_hash, 'success')
+    # second receipt of the same tx is not counted
+    track_transaction_receipt(tx_hash, 'success')
+
+    assert counter._value.get() == count_before + 1
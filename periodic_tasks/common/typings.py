@@ -5,6 +5,8 @@ from hexbytes import HexBytes
 from web3 import Web3
 from web3.types import Wei
 
+from periodic_tasks.common.utils import to_checksum_address
+
 
 @dataclass
 class HarvestParams:
@@ -14,6 +16,17 @@ class HarvestParams:
     proof: list[HexBytes]
 
 
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
 @dataclass
 class Vault:
     address: ChecksumAddress
@@ -40,20 +53,11 @@ class Vault:
 
     @staticmethod
     def from_graph(vault_item: dict) -> 'Vault':
-        vault_address = Web3.to_checksum_address(vault_item['id'])
-        is_meta_vault = vault_item['isMetaVault']
-
-        sub_vaults = [
-            Web3.to_checksum_address(sub_vault['subVault']) for sub_vault in vault_item['subVaults']
-        ]
-
-        can_harvest = vault_item['canHarvest']
-
-        # rewardsRoot
+        vault_address = to_checksum_address(vault_item['id'])
         is_meta_vault = vault_item['isMetaVault']
 
         sub_vaults = [
-            Web3.to_checksum_address(sub_vault['subVault']) for sub_vault in vault_item['subVaults']
+            to_checksum_address(sub_vault['subVault']) for sub_vault in vault_item['subVaults']
         ]
 
         can_harvest = vault_item['canHarvest']
@@ -0,0 +1,22 @@
+from functools import lru_cache
+from typing import Iterator, Sequence, TypeVar
+
+from eth_typing import ChecksumAddress
+from web3 import Web3
+
+T = TypeVar('T')
+
+# Vault and user addresses repeat across subgraph rows, keep the most recent ones
+ADDRESS_CACHE_SIZE = 2**14
+
+
+def chunkify(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    """Splits sequence into consecutive chunks of at most `size` items."""
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def to_checksum_address(address: str) -> ChecksumAddress:
+    """Cached `Web3.to_checksum_address`, checksumming computes keccak on every call."""
+    return Web3.to_checksum_address(address)
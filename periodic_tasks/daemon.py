@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from eth_account.signers.local import LocalAccount
+from prometheus_client import start_http_server
+from sw_utils import InterruptHandler
+
+import periodic_tasks
+from periodic_tasks.common.clients import (
+    execution_client,
+    hot_wallet_account,
+    setup_execution_client,
+)
+from periodic_tasks.common.contracts import contract_registry
+from periodic_tasks.common.graph_cache import graph_cache_scope
+from periodic_tasks.common.graph_client import graph_client
+from periodic_tasks.common.instrumentation import current_task
+from periodic_tasks.common.logs import setup_logging
+from periodic_tasks.common.sentry import setup_sentry
+from periodic_tasks.common.settings import (
+    DAEMON_METRICS_PORT,
+    FORCE_EXITS_INTERVAL,
+    META_VAULTS_INTERVAL,
+    METRICS_HOST,
+    NETWORK,
+    UPDATE_LTV_INTERVAL,
+    UPDATE_PRICE_INTERVAL,
+)
+from periodic_tasks.common.startup_checks import (
+    wait_for_graph_node_sync_to_finalized_block,
+)
+
+logger = logging.getLogger(__name__)
+
+# seconds between checks for the interrupt signal
+INTERRUPT_CHECK_INTERVAL = 1
+
+
+@dataclass
+class ScheduledTask:
+    name: str
+    interval: int
+    run: Callable[[], Awaitable[None]]
+
+
+async def get_scheduled_tasks(account: LocalAccount) -> list[ScheduledTask]:
+    """
+    Returns enabled tasks. Task modules are imported only when the task is enabled
+    because each of them requires its own settings.
+    """
+    # pylint: disable=import-outside-toplevel
+    tasks: list[ScheduledTask] = []
+
+    if FORCE_EXITS_INTERVAL:
+        from periodic_tasks.exit.settings import SUPPORTED_NETWORKS as EXIT_NETWORKS
+        from periodic_tasks.exit.tasks import force_exits
+
+        if NETWORK not in EXIT_NETWORKS:
+            raise ValueError(f'Force exits in network {NETWORK} is not supported')
+        tasks.append(ScheduledTask('force_exits', FORCE_EXITS_INTERVAL, force_exits))
+
+    if UPDATE_LTV_INTERVAL:
+        from periodic_tasks.ltv.settings import SUPPORTED_NETWORKS as LTV_NETWORKS
+        from periodic_tasks.ltv.tasks import update_vault_max_ltv_user
+
+        if NETWORK not in LTV_NETWORKS:
+            raise ValueError(f'Update LTV in network {NETWORK} is not supported')
+        tasks.append(ScheduledTask('update_ltv', UPDATE_LTV_INTERVAL, update_vault_max_ltv_user))
+
+    if META_VAULTS_INTERVAL:
+        from periodic_tasks.meta_vault.tasks import process_meta_vaults
+
+        tasks.append(ScheduledTask('meta_vaults', META_VAULTS_INTERVAL, process_meta_vaults))
+
+    if UPDATE_PRICE_INTERVAL:
+        from periodic_tasks.price.clients import sender_execution_client
+        from periodic_tasks.price.settings import SUPPORTED_NETWORKS as PRICE_NETWORKS
+        from periodic_tasks.price.tasks import check_and_sync
+
+        if NETWORK not in PRICE_NETWORKS:
+            raise ValueError(f'Price update in network {NETWORK} is not supported')
+        await setup_execution_client(sender_execution_client, account)
+        tasks.append(ScheduledTask('update_price', UPDATE_PRICE_INTERVAL, check_and_sync))
+
+    return tasks
+
+
+async def run_task(task: ScheduledTask) -> None:
+    logger.info('Running task %s', task.name)
+    current_task.set(task.name)
+    start_time = time.time()
+    try:
+        # subgraph responses are reused within a single run only
+        with graph_cache_scope():
+            await task.run()
+    except Exception as e:
+        logger.error('Task %s failed: %s', task.name, e)
+        logger.exception(e)
+        return
+    logger.info('Task %s completed in %.1f sec', task.name, time.time() - start_time)
+    contract_registry.log_stats()
+
+
+async def run_task_loop(task: ScheduledTask, stop_event: asyncio.Event) -> None:
+    """Runs the task on its own interval until the daemon is stopped."""
+    while not stop_event.is_set():
+        next_run_time = time.time() + task.interval
+        await run_task(task)
+        try:
+            await asyncio.wait_for(stop_event.wait(), max(next_run_time - time.time(), 0))
+        except asyncio.TimeoutError:
+            pass
+
+
+async def main() -> None:
+    logger.info('Starting periodic tasks daemon %s', periodic_tasks.__version__)
+
+    if not hot_wallet_account:
+        raise ValueError('Set HOT_WALLET_PRIVATE_KEY environment variable')
+
+    await setup_execution_client(execution_client, hot_wallet_account)
+    # expose subgraph, RPC and transaction metrics
+    start_http_server(DAEMON_METRICS_PORT, METRICS_HOST)
+
+    tasks = await get_scheduled_tasks(hot_wallet_account)
+    if not tasks:
+        raise ValueError('No tasks enabled, set at least one of the task intervals')
+
+    await wait_for_graph_node_sync_to_finalized_block(
+        graph_client=graph_client,
+        execution_client=execution_client,
+    )
+
+    stop_event = asyncio.Event()
+    with InterruptHandler() as interrupt_handler:
+        # each task runs in its own loop so that waiting for receipts
+        # in one task does not delay the others
+        task_loops = [asyncio.create_task(run_task_loop(task, stop_event)) for task in tasks]
+        while not interrupt_handler.exit:
+            await interrupt_handler.sleep(INTERRUPT_CHECK_INTERVAL)
+
+        # running tasks are completed before exit
+        stop_event.set()
+        await asyncio.gather(*task_loops)
+
+
+setup_logging()
+setup_sentry()
+asyncio.run(main())
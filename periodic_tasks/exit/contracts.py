@@ -61,10 +61,18 @@ async def get_strategy_proxy_contract(proxy: ChecksumAddress) -> StrategyProxyCo
 
 
 async def get_leverage_strategy_contract(proxy: ChecksumAddress) -> LeverageStrategyContract:
-    proxy_contract = await get_strategy_proxy_contract(proxy)
-    leverage_strategy_address = await proxy_contract.get_owner()
+    leverage_strategy_address = await get_leverage_strategy_address(proxy)
     return LeverageStrategyContract(
         abi_path='abi/ILeverageStrategy.json',
         address=leverage_strategy_address,
         client=execution_client,
     )
+
+
+async def get_leverage_strategy_address(proxy: ChecksumAddress) -> ChecksumAddress:
+    """
+    Returns leverage strategy owning the proxy.
+    Resolved on every run, so force exits follow strategy upgrades immediately.
+    """
+    proxy_contract = await get_strategy_proxy_contract(proxy)
+    return await proxy_contract.get_owner()
@@ -1,64 +1,135 @@
+import asyncio
 import logging
 
 from eth_typing import ChecksumAddress, HexStr
 from web3 import Web3
-from web3.types import BlockNumber
+from web3.exceptions import TimeExhausted, TransactionNotFound
+from web3.types import BlockNumber, TxReceipt
 
 from periodic_tasks.common.clients import execution_client
 from periodic_tasks.common.contracts import keeper_contract, multicall_contract
-from periodic_tasks.common.execution import transaction_gas_wrapper
-from periodic_tasks.common.settings import EXECUTION_TRANSACTION_TIMEOUT
+from periodic_tasks.common.execution import transaction_gas_wrapper, wait_for_tx_receipt
+from periodic_tasks.common.settings import MULTICALL_BATCH_SIZE
 from periodic_tasks.common.typings import HarvestParams
+from periodic_tasks.common.utils import chunkify
 
 from .contracts import LeverageStrategyContract
-from .typings import ExitRequest
+from .settings import FORCE_EXIT_BUNDLE_GAS_FRACTION, FORCE_EXIT_CONCURRENCY
+from .typings import BundleItem, ExitRequest, ForceExitEligibility, LeveragePosition
 
 logger = logging.getLogger(__name__)
 
+# covers the outer aggregate call, item estimates include only the calls of a single item
+BUNDLE_GAS_MARGIN = 50_000
 
-async def can_force_enter_exit_queue(
+
+async def get_force_exit_eligibility(
+    positions: list[LeveragePosition],
+    leverage_strategy_contracts: dict[ChecksumAddress, LeverageStrategyContract],
+    vaults_harvest_params: dict[ChecksumAddress, HarvestParams | None],
+    block_number: BlockNumber,
+    batch_size: int = MULTICALL_BATCH_SIZE,
+) -> dict[str, ForceExitEligibility]:
+    """
+    Checks canForceEnterExitQueue for all positions with a few multicalls.
+    `leverage_strategy_contracts` maps position proxy to its leverage strategy,
+    `vaults_harvest_params` maps vault to its harvest params.
+    Vault state update is called once per vault in a batch, before the vault positions checks.
+    Positions with claimable exit requests are checked again after a simulated claim,
+    because the claim changes the position.
+    Calls may fail individually, failed checks are treated as not eligible.
+    Returns mapping from position id to eligibility.
+    """
+    await keeper_contract.prefetch_can_harvest(
+        vaults=list(set(position.vault for position in positions)), block_number=block_number
+    )
+    eligibility: dict[str, ForceExitEligibility] = {}
+
+    for batch in chunkify(positions, batch_size):
+        calls: list[tuple[ChecksumAddress, bool, HexStr]] = []
+        # indexes of the checks before and after the claim
+        check_indexes: list[tuple[int, int]] = []
+        updated_vaults: set[tuple[ChecksumAddress, ChecksumAddress]] = set()
+
+        for position in batch:
+            leverage_strategy_contract = leverage_strategy_contracts[position.proxy]
+            harvest_params = vaults_harvest_params.get(position.vault)
+            update_state_key = (leverage_strategy_contract.address, position.vault)
+            if (
+                harvest_params
+                and update_state_key not in updated_vaults
+                and await keeper_contract.can_harvest(position.vault, block_number)
+            ):
+                update_state_call = _encode_update_state_call(
+                    leverage_strategy_contract, position.vault, harvest_params
+                )
+                calls.append((leverage_strategy_contract.address, True, update_state_call))
+                updated_vaults.add(update_state_key)
+
+            can_force_enter_exit_queue_call = (
+                leverage_strategy_contract.address,
+                True,
+                leverage_strategy_contract.encode_abi(
+                    fn_name='canForceEnterExitQueue', args=[position.vault, position.user]
+                ),
+            )
+            check_index = len(calls)
+            calls.append(can_force_enter_exit_queue_call)
+
+            if position.exit_request and position.exit_request.is_fully_claimable:
+                claim_address, claim_call = encode_claim_exited_assets_call(
+                    leverage_strategy_contract=leverage_strategy_contract,
+                    vault=position.vault,
+                    user=position.user,
+                    exit_request=position.exit_request,
+                )
+                calls.append((claim_address, True, claim_call))
+                calls.append(can_force_enter_exit_queue_call)
+            check_indexes.append((check_index, len(calls) - 1))
+
+        response = await multicall_contract.aggregate3(calls, block_number)
+        for position, (check_index, check_after_claim_index) in zip(batch, check_indexes):
+            eligibility[position.id] = ForceExitEligibility(
+                can_force_exit=_get_check_result(response[check_index], position),
+                can_force_exit_after_claim=_get_check_result(
+                    response[check_after_claim_index], position
+                ),
+            )
+
+    return eligibility
+
+
+def _get_check_result(result: tuple[bool, bytes], position: LeveragePosition) -> bool:
+    success, data = result
+    if not success:
+        logger.warning(
+            'Failed to check force exit for leverage position: vault=%s, user=%s',
+            position.vault,
+            position.user,
+        )
+    return success and bool(Web3.to_int(data))
+
+
+async def get_update_state_call(
     leverage_strategy_contract: LeverageStrategyContract,
     vault: ChecksumAddress,
-    user: ChecksumAddress,
     harvest_params: HarvestParams | None,
     block_number: BlockNumber,
-) -> bool:
-    calls = []
-    update_state_call = None
-    if harvest_params and await keeper_contract.can_harvest(vault, block_number):
-        update_state_call = (
-            leverage_strategy_contract.address,
-            _encode_update_state_call(leverage_strategy_contract, vault, harvest_params),
-        )
-        calls.append(update_state_call)
-
-    can_force_enter_exit_queue_call = leverage_strategy_contract.encode_abi(
-        fn_name='canForceEnterExitQueue', args=[vault, user]
+) -> tuple[ChecksumAddress, HexStr] | None:
+    if not harvest_params or not await keeper_contract.can_harvest(vault, block_number):
+        return None
+    return (
+        leverage_strategy_contract.address,
+        _encode_update_state_call(leverage_strategy_contract, vault, harvest_params),
     )
-    calls.append((leverage_strategy_contract.address, can_force_enter_exit_queue_call))
-    _, response = await multicall_contract.aggregate(calls, block_number)
-    if update_state_call:
-        response.pop(0)
-    return bool(Web3.to_int(response.pop(0)))
 
 
-# pylint: disable-next=too-many-arguments
-async def claim_exited_assets(
+def encode_claim_exited_assets_call(
     leverage_strategy_contract: LeverageStrategyContract,
     vault: ChecksumAddress,
     user: ChecksumAddress,
     exit_request: ExitRequest,
-    harvest_params: HarvestParams | None,
-    block_number: BlockNumber,
-) -> HexStr | None:
-    calls = []
-    if harvest_params and await keeper_contract.can_harvest(vault, block_number):
-        update_state_call = (
-            leverage_strategy_contract.address,
-            _encode_update_state_call(leverage_strategy_contract, vault, harvest_params),
-        )
-        calls.append(update_state_call)
-
+) -> tuple[ChecksumAddress, HexStr]:
     claim_call = leverage_strategy_contract.encode_abi(
         fn_name='claimExitedAssets',
         args=[
@@ -67,83 +138,171 @@ async def claim_exited_assets(
             (exit_request.position_ticket, exit_request.timestamp, exit_request.exit_queue_index),
         ],
     )
-    calls.append((leverage_strategy_contract.address, claim_call))
-    try:
-        tx_function = multicall_contract.functions.aggregate(calls)
-        tx = await transaction_gas_wrapper(
-            client=multicall_contract.contract.w3, tx_function=tx_function
-        )
-    except Exception as e:
-        logger.error(
-            'Failed to claim exited assets for leverage position: vault=%s, user=%s %s...',
-            vault,
-            user,
-            e,
-        )
-        logger.exception(e)
-
-        return None
-
-    tx_hash = Web3.to_hex(tx)
-    logger.info('Waiting for transaction %s confirmation', tx_hash)
-    tx_receipt = await execution_client.eth.wait_for_transaction_receipt(
-        tx, timeout=EXECUTION_TRANSACTION_TIMEOUT
-    )
-    if not tx_receipt['status']:
-        logger.error(
-            'Failed to confirm exited assets claim for leverage position: vault=%s, user=%s...',
-            vault,
-            user,
-        )
-        return None
-
-    return tx_hash
+    return leverage_strategy_contract.address, claim_call
 
 
-async def force_enter_exit_queue(
+def encode_force_enter_exit_queue_call(
     leverage_strategy_contract: LeverageStrategyContract,
     vault: ChecksumAddress,
     user: ChecksumAddress,
-    harvest_params: HarvestParams | None,
-    block_number: BlockNumber,
-) -> HexStr | None:
-    calls = []
-    if harvest_params and await keeper_contract.can_harvest(vault, block_number):
-        update_state_call = (
-            leverage_strategy_contract.address,
-            _encode_update_state_call(leverage_strategy_contract, vault, harvest_params),
-        )
-        calls.append(update_state_call)
-
+) -> tuple[ChecksumAddress, HexStr]:
     force_enter_call = leverage_strategy_contract.encode_abi(
         fn_name='forceEnterExitQueue',
         args=[vault, user],
     )
-    calls.append((leverage_strategy_contract.address, force_enter_call))
+    return leverage_strategy_contract.address, force_enter_call
+
+
+async def submit_bundles(items: list[BundleItem]) -> None:
+    """
+    Packs calls of many positions into as few multicall transactions as possible.
+    Each bundle is bounded by FORCE_EXIT_BUNDLE_GAS_FRACTION of the block gas limit,
+    calls keep their order and vault state updates are deduplicated within a bundle.
+    Bundles are sent without waiting for the previous receipts,
+    a reverted bundle is split in halves until the failing items are isolated.
+    """
+    estimated_items = await asyncio.gather(*(_estimate_item_gas(item) for item in items))
+    items = [item for item in estimated_items if item]
+    if not items:
+        return
+
+    block = await execution_client.eth.get_block('latest')
+    bundle_gas_limit = int(block['gasLimit'] * FORCE_EXIT_BUNDLE_GAS_FRACTION)
+    bundles = _pack_bundles(items, bundle_gas_limit)
+    logger.info('Submitting %d items in %d bundles...', len(items), len(bundles))
+
+    semaphore = asyncio.Semaphore(FORCE_EXIT_CONCURRENCY)
+    await asyncio.gather(*(_submit_bundle(bundle, semaphore) for bundle in bundles))
+
+
+async def _estimate_item_gas(item: BundleItem) -> BundleItem | None:
+    """
+    Fills item gas estimate.
+    Returns the item, its estimated fallback if the item calls revert, or None.
+    """
+    try:
+        item.gas = await multicall_contract.functions.aggregate(item.get_calls()).estimate_gas()
+    except Exception as e:
+        if item.fallback:
+            logger.warning('Calls of %s revert, trying fallback: %s', item.description, e)
+            return await _estimate_item_gas(item.fallback)
+        logger.error('Skip %s, calls revert: %s', item.description, e)
+        return None
+    return item
+
+
+def _pack_bundles(items: list[BundleItem], bundle_gas_limit: int) -> list[list[BundleItem]]:
+    bundles: list[list[BundleItem]] = []
+    bundle: list[BundleItem] = []
+    bundle_gas = 0
+    for item in items:
+        if bundle and bundle_gas + item.gas > bundle_gas_limit:
+            bundles.append(bundle)
+            bundle, bundle_gas = [], 0
+        bundle.append(item)
+        bundle_gas += item.gas
+    if bundle:
+        bundles.append(bundle)
+    return bundles
+
+
+async def _submit_bundle(bundle: list[BundleItem], semaphore: asyncio.Semaphore) -> None:
+    """
+    Sends the bundle and splits it if the transaction fails to send or reverts.
+    The halves are sent concurrently, the semaphore bounds the number of pending transactions.
+    """
+    async with semaphore:
+        is_sent = await _send_bundle(bundle)
+    if is_sent:
+        return
+
+    if len(bundle) > 1:
+        # Bisect the bundle to isolate the failing items
+        middle = len(bundle) // 2
+        logger.warning('Bundle of %d items failed, splitting...', len(bundle))
+        await asyncio.gather(
+            _submit_bundle(bundle[:middle], semaphore),
+            _submit_bundle(bundle[middle:], semaphore),
+        )
+        return
+
+    item = bundle[0]
+    fallback = await _estimate_item_gas(item.fallback) if item.fallback else None
+    if fallback:
+        logger.warning('Failed to process %s, sending %s', item.description, fallback.description)
+        await _submit_bundle([fallback], semaphore)
+        return
+    logger.error('Failed to process %s', item.description)
+
+
+async def _send_bundle(bundle: list[BundleItem], resend_dropped: bool = True) -> bool:
+    """
+    Sends the bundle in a single transaction.
+    Returns False if the transaction fails to send or reverts.
+    A transaction without receipt in time may still be mined, so it is not reported as failed:
+    the bundle is resent once only if the transaction was dropped by the node.
+    """
+    calls: list[tuple[ChecksumAddress, HexStr]] = []
+    for item in bundle:
+        if item.update_state_call and item.update_state_call not in calls:
+            calls.append(item.update_state_call)
+        calls.extend(item.calls)
+
     try:
-        tx_function = multicall_contract.functions.aggregate(calls)
         tx = await transaction_gas_wrapper(
-            client=multicall_contract.contract.w3, tx_function=tx_function
+            client=multicall_contract.contract.w3,
+            tx_function=multicall_contract.functions.aggregate(calls),
+            # estimates are summed up, so the limit covers deduplicated calls as well
+            tx_params={'gas': sum(item.gas for item in bundle) + BUNDLE_GAS_MARGIN},
         )
     except Exception as e:
-        logger.error('Failed to force enter exit queue; vault=%s, user=%s %s: ', vault, user, e)
         logger.exception(e)
-        return None
+        return False
 
     tx_hash = Web3.to_hex(tx)
     logger.info('Waiting for transaction %s confirmation', tx_hash)
-    tx_receipt = await execution_client.eth.wait_for_transaction_receipt(
-        tx, timeout=EXECUTION_TRANSACTION_TIMEOUT
-    )
-    if not tx_receipt['status']:
-        logger.error(
-            'Failed to confirm force enter exit queue: vault=%s, user=%s...',
-            vault,
-            user,
-        )
+    try:
+        tx_receipt: TxReceipt | None = await wait_for_tx_receipt(execution_client, tx_hash)
+    except TimeExhausted:
+        tx_receipt = await _get_timed_out_tx_receipt(tx_hash)
+
+    if tx_receipt is None:
+        if await _is_tx_pending(tx_hash):
+            logger.error(
+                'Transaction %s is still pending, skip %d items until the next run',
+                tx_hash,
+                len(bundle),
+            )
+            return True
+        if not resend_dropped:
+            logger.error('Transaction %s was dropped, skip %d items', tx_hash, len(bundle))
+            return True
+        logger.warning('Transaction %s was dropped, resending bundle...', tx_hash)
+        return await _send_bundle(bundle, resend_dropped=False)
+
+    if tx_receipt['status']:
+        for item in bundle:
+            logger.info('Successfully processed %s', item.description)
+        return True
+
+    logger.error('Transaction %s reverted', tx_hash)
+    return False
+
+
+async def _get_timed_out_tx_receipt(tx_hash: HexStr) -> TxReceipt | None:
+    """The transaction may have been mined right after the timeout."""
+    try:
+        return await execution_client.eth.get_transaction_receipt(tx_hash)
+    except TransactionNotFound:
         return None
 
-    return tx_hash
+
+async def _is_tx_pending(tx_hash: HexStr) -> bool:
+    try:
+        await execution_client.eth.get_transaction(tx_hash)
+    except TransactionNotFound:
+        return False
+    return True
 
 
 def _encode_update_state_call(
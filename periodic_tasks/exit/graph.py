@@ -1,34 +1,60 @@
 from collections import defaultdict
 
 from gql import gql
-from web3 import Web3
 from web3.types import BlockNumber, ChecksumAddress
 
+from periodic_tasks.common.graph import fetch_pages_by_id, fetch_pages_by_id_chunked
 from periodic_tasks.common.graph_client import graph_client
+from periodic_tasks.common.utils import to_checksum_address
 
 from .typings import ExitRequest, LeveragePosition, OsTokenExitRequest
 
 DISABLED_LIQ_THRESHOLD = 2**64 - 1
 
 
-async def graph_get_leverage_positions(block_number: BlockNumber) -> list[LeveragePosition]:
+async def graph_get_leverage_positions(
+    block_number: BlockNumber,
+    borrow_ltv: float | None = None,
+    proxies: list[ChecksumAddress] | None = None,
+) -> list[LeveragePosition]:
+    """
+    Returns leverage positions sorted by borrow LTV.
+    Positions are filtered on the subgraph side by `borrow_ltv` and `proxies`.
+    """
+    if proxies == []:
+        return []
+
+    variables = ['$block: Int', '$first: Int', '$lastId: String']
+    where_conditions = ['id_gt: $lastId']
+    params: dict = {'block': block_number}
+
+    if borrow_ltv is not None:
+        variables.append('$borrowLtv: String')
+        where_conditions.append('borrowLtv_gt: $borrowLtv')
+        params['borrowLtv'] = str(borrow_ltv)
+
+    if proxies:
+        variables.append('$proxies: [Bytes]')
+        where_conditions.append('proxy_in: $proxies')
+        params['proxies'] = [proxy.lower() for proxy in set(proxies)]
+
     query = gql(
-        """
-        query PositionsQuery($block: Int, $first: Int, $skip: Int) {
+        f"""
+        query PositionsQuery({', '.join(variables)}) {{
           leverageStrategyPositions(
-            block: { number: $block },
-            orderBy: borrowLtv,
-            orderDirection: desc,
-            first: $first,
-            skip: $skip
-          ) {
+            block: {{ number: $block }},
+            where: {{ {', '.join(where_conditions)} }},
+            orderBy: id,
+            first: $first
+          ) {{
+            id
             user
             proxy
             borrowLtv
-            vault {
+            vault {{
               id
-            }
-            exitRequest {
+            }}
+            exitRequest {{
               id
               positionTicket
               timestamp
@@ -38,34 +64,69 @@ async def graph_get_leverage_positions(block_number: BlockNumber) -> list[Levera
               isClaimable
               exitedAssets
               totalAssets
-              vault {
+              vault {{
                 id
-              }
-            }
-          }
-        }
+              }}
+            }}
+          }}
+        }}
         """
     )
-    params = {'block': block_number}
-    response = await graph_client.fetch_pages(query, params=params)
+    if proxies:
+        response = await fetch_pages_by_id_chunked(graph_client, query, params, 'proxies')
+    else:
+        response = await fetch_pages_by_id(graph_client, query, params)
     result = []
     for data in response:
         position = LeveragePosition(
-            vault=Web3.to_checksum_address(data['vault']['id']),
-            user=Web3.to_checksum_address(data['user']),
-            proxy=Web3.to_checksum_address(data['proxy']),
+            vault=to_checksum_address(data['vault']['id']),
+            user=to_checksum_address(data['user']),
+            proxy=to_checksum_address(data['proxy']),
             borrow_ltv=float(data['borrowLtv']),
         )
         if data['exitRequest']:
             position.exit_request = ExitRequest.from_graph(data['exitRequest'])
 
         result.append(position)
+
+    result.sort(key=lambda position: position.borrow_ltv, reverse=True)
     return result
 
 
+async def graph_get_leverage_proxies(block_number: BlockNumber) -> list[ChecksumAddress]:
+    """
+    Returns strategy proxy addresses of all leverage positions
+    """
+    query = gql(
+        """
+        query PositionsQuery($block: Int, $first: Int, $lastId: String) {
+          leverageStrategyPositions(
+            block: { number: $block },
+            where: { id_gt: $lastId },
+            orderBy: id,
+            first: $first
+          ) {
+            id
+            proxy
+          }
+        }
+        """
+    )
+    params = {'block': block_number}
+    response = await fetch_pages_by_id(graph_client, query, params)
+    return [to_checksum_address(data['proxy']) for data in response]
+
+
 async def graph_get_allocators(
     ltv: float, addresses: list[ChecksumAddress], block_number: BlockNumber
 ) -> list[ChecksumAddress]:
+    """
+    Returns addresses of allocators with LTV above the given one, sorted by LTV.
+    Allocators in vaults with disabled liquidations are skipped.
+    """
+    if not addresses:
+        return []
+
     query = gql(
         """
         query AllocatorsQuery(
@@ -73,17 +134,17 @@ async def graph_get_allocators(
           $addresses: [String],
           $block: Int,
           $first: Int,
-          $skip: Int
+          $lastId: String
         ) {
           allocators(
             block: { number: $block },
-            where: { ltv_gt: $ltv, address_in: $addresses },
-            orderBy: ltv,
-            orderDirection: desc,
-            first: $first,
-            skip: $skip
+            where: { ltv_gt: $ltv, address_in: $addresses, id_gt: $lastId },
+            orderBy: id,
+            first: $first
           ) {
+            id
             address
+            ltv
             vault {
               osTokenConfig {
                 liqThresholdPercent
@@ -95,16 +156,17 @@ async def graph_get_allocators(
     )
     params = {
         'ltv': str(ltv),
-        'addresses': [address.lower() for address in addresses],
+        'addresses': [address.lower() for address in set(addresses)],
         'block': block_number,
     }
-    response = await graph_client.fetch_pages(query, params=params)
+    response = await fetch_pages_by_id_chunked(graph_client, query, params, 'addresses')
+    response.sort(key=lambda data: float(data['ltv']), reverse=True)
     result = []
     for data in response:
         vault_liq_threshold = int(data['vault']['osTokenConfig']['liqThresholdPercent'])
         if vault_liq_threshold != DISABLED_LIQ_THRESHOLD:
             result.append(
-                Web3.to_checksum_address(data['address']),
+                to_checksum_address(data['address']),
             )
     return result
 
@@ -114,12 +176,12 @@ async def graph_ostoken_exit_requests(
 ) -> list[OsTokenExitRequest]:
     query = gql(
         """
-        query ExitRequestsQuery($ltv: String, $block: Int, $first: Int, $skip: Int) {
+        query ExitRequestsQuery($ltv: String, $block: Int, $first: Int, $lastId: String) {
           osTokenExitRequests(
             block: { number: $block },
-            where: {ltv_gt: $ltv}
+            where: { ltv_gt: $ltv, id_gt: $lastId }
+            orderBy: id
             first: $first
-            skip: $skip
             ) {
             id
             owner
@@ -134,7 +196,7 @@ async def graph_ostoken_exit_requests(
         """
     )
     params = {'ltv': str(ltv), 'block': block_number}
-    response = await graph_client.fetch_pages(query, params=params)
+    response = await fetch_pages_by_id(graph_client, query, params)
 
     if not response:
         return []
@@ -153,8 +215,8 @@ async def graph_ostoken_exit_requests(
         result.append(
             OsTokenExitRequest(
                 id=data['id'],
-                vault=Web3.to_checksum_address(data['vault']['id']),
-                owner=Web3.to_checksum_address(data['owner']),
+                vault=to_checksum_address(data['vault']['id']),
+                owner=to_checksum_address(data['owner']),
                 ltv=data['ltv'],
                 exit_request=exit_request,
             )
@@ -163,19 +225,36 @@ async def graph_ostoken_exit_requests(
     return result
 
 
-async def graph_get_leverage_position_owner(proxy: ChecksumAddress) -> ChecksumAddress:
+async def graph_get_leverage_positions_owners(
+    proxies: list[ChecksumAddress], block_number: BlockNumber
+) -> dict[ChecksumAddress, ChecksumAddress]:
+    """
+    Returns mapping from strategy proxy address to leverage position owner
+    """
+    if not proxies:
+        return {}
+
     query = gql(
         """
-        query PositionsQuery($proxy: Bytes) {
-          leverageStrategyPositions(where: { proxy: $proxy }) {
+        query PositionsQuery($proxies: [Bytes], $block: Int, $first: Int, $lastId: String) {
+          leverageStrategyPositions(
+            block: { number: $block },
+            where: { proxy_in: $proxies, id_gt: $lastId },
+            orderBy: id,
+            first: $first
+          ) {
+            id
+            proxy
             user
           }
         }
         """
     )
-    params = {'proxy': proxy.lower()}
-    response = await graph_client.run_query(query, params)
-    return Web3.to_checksum_address(response['leverageStrategyPositions'][0]['user'])
+    params = {'proxies': [proxy.lower() for proxy in set(proxies)], 'block': block_number}
+    response = await fetch_pages_by_id_chunked(graph_client, query, params, 'proxies')
+    return {
+        to_checksum_address(data['proxy']): to_checksum_address(data['user']) for data in response
+    }
 
 
 async def graph_get_exit_requests_by_ids(
@@ -183,13 +262,12 @@ async def graph_get_exit_requests_by_ids(
 ) -> list[ExitRequest]:
     query = gql(
         """
-        query exitRequestQuery($ids: [String], $block: Int, $first: Int, $skip: Int) {
+        query exitRequestQuery($ids: [String], $block: Int, $first: Int, $lastId: String) {
           exitRequests(
             block: { number: $block },
-            where: { id_in: $ids },
+            where: { id_in: $ids, id_gt: $lastId },
             orderBy: id,
-            first: $first,
-            skip: $skip
+            first: $first
           ) {
             id
             positionTicket
@@ -208,7 +286,7 @@ async def graph_get_exit_requests_by_ids(
         """
     )
     params = {'block': block_number, 'ids': ids}
-    response = await graph_client.fetch_pages(query, params=params)
+    response = await fetch_pages_by_id_chunked(graph_client, query, params, 'ids')
     result = []
     for data in response:
         result.append(ExitRequest.from_graph(data))
@@ -253,7 +331,7 @@ async def graph_get_exit_requests_for_meta_vault(
     result = defaultdict(list)
 
     for data in response:
-        vault = Web3.to_checksum_address(data['vault']['id'])
+        vault = to_checksum_address(data['vault']['id'])
         result[vault].append(ExitRequest.from_graph(data))
 
     return result
@@ -3,6 +3,13 @@ from sw_utils import ETH_NETWORKS
 
 LTV_PERCENT_DELTA: float = config('LTV_PERCENT_DELTA', default='0.0002', cast=float)
 
+# Max number of force exit transactions in flight
+FORCE_EXIT_CONCURRENCY: int = config('FORCE_EXIT_CONCURRENCY', default='5', cast=int)
+# Max gas of a force exit transaction as a fraction of the block gas limit
+FORCE_EXIT_BUNDLE_GAS_FRACTION: float = config(
+    'FORCE_EXIT_BUNDLE_GAS_FRACTION', default='0.25', cast=float
+)
+
 # graph
 GRAPH_API_URL: str = config('GRAPH_API_URL')
 GRAPH_API_TIMEOUT: int = config('GRAPH_API_TIMEOUT', default='10', cast=int)
@@ -1,8 +1,10 @@
+import asyncio
 import logging
 
-from web3.types import BlockNumber
+from web3.types import BlockNumber, ChecksumAddress
 
 from periodic_tasks.common.clients import execution_client
+from periodic_tasks.common.contracts import keeper_contract
 from periodic_tasks.common.graph import graph_get_vaults
 from periodic_tasks.common.graph_client import graph_client
 from periodic_tasks.common.settings import network_config
@@ -10,23 +12,27 @@ from periodic_tasks.common.startup_checks import wait_for_graph_node_sync_to_blo
 from periodic_tasks.common.typings import HarvestParams
 
 from .contracts import (
+    LeverageStrategyContract,
     get_leverage_strategy_contract,
     ostoken_vault_escrow_contract,
     strategy_registry_contract,
 )
 from .execution import (
-    can_force_enter_exit_queue,
-    claim_exited_assets,
-    force_enter_exit_queue,
+    encode_claim_exited_assets_call,
+    encode_force_enter_exit_queue_call,
+    get_force_exit_eligibility,
+    get_update_state_call,
+    submit_bundles,
 )
 from .graph import (
     graph_get_allocators,
-    graph_get_leverage_position_owner,
     graph_get_leverage_positions,
+    graph_get_leverage_positions_owners,
+    graph_get_leverage_proxies,
     graph_ostoken_exit_requests,
 )
 from .settings import LTV_PERCENT_DELTA
-from .typings import LeveragePosition, OsTokenExitRequest
+from .typings import BundleItem, LeveragePosition, OsTokenExitRequest
 
 logger = logging.getLogger(__name__)
 
@@ -61,16 +67,49 @@ async def handle_leverage_positions(block_number: BlockNumber) -> None:
 
     vault_addresses = list(set(position.vault for position in leverage_positions))
     graph_vaults = await graph_get_vaults(graph_client=graph_client, vaults=vault_addresses)
+    vaults_harvest_params: dict[ChecksumAddress, HarvestParams | None] = {
+        vault: graph_vault.harvest_params for vault, graph_vault in graph_vaults.items()
+    }
+    proxies = list(set(position.proxy for position in leverage_positions))
+    leverage_strategy_contracts = dict(
+        zip(proxies, await asyncio.gather(*(get_leverage_strategy_contract(p) for p in proxies)))
+    )
 
-    # check by position borrow ltv
+    # Check all positions at once
+    eligibility = await get_force_exit_eligibility(
+        positions=leverage_positions,
+        leverage_strategy_contracts=leverage_strategy_contracts,
+        vaults_harvest_params=vaults_harvest_params,
+        block_number=block_number,
+    )
+    eligible_positions = []
     for position in leverage_positions:
-        harvest_params = graph_vaults[position.vault].harvest_params
+        if eligibility[position.id].can_force_exit:
+            eligible_positions.append(position)
+            continue
+        logger.info(
+            'Skip leverage positions because it cannot be forcefully closed: vault=%s, user=%s...',
+            position.vault,
+            position.user,
+        )
 
-        await handle_leverage_position(
-            position=position,
-            harvest_params=harvest_params,
-            block_number=block_number,
+    # Process the riskiest positions first
+    leverage_positions = sorted(
+        eligible_positions, key=lambda position: position.borrow_ltv, reverse=True
+    )
+    bundle_items = await asyncio.gather(
+        *(
+            get_leverage_position_bundle_item(
+                position=position,
+                leverage_strategy_contract=leverage_strategy_contracts[position.proxy],
+                harvest_params=vaults_harvest_params[position.vault],
+                can_force_exit_after_claim=eligibility[position.id].can_force_exit_after_claim,
+                block_number=block_number,
+            )
+            for position in leverage_positions
         )
+    )
+    await submit_bundles(bundle_items)
 
 
 async def handle_ostoken_exit_requests(block_number: BlockNumber) -> None:
@@ -84,34 +123,28 @@ async def handle_ostoken_exit_requests(block_number: BlockNumber) -> None:
     logger.info('Force assets claim for %d exit requests...', len(exit_requests))
     vault_addresses = list(set(request.vault for request in exit_requests))
     graph_vaults = await graph_get_vaults(graph_client=graph_client, vaults=vault_addresses)
+    await keeper_contract.prefetch_can_harvest(vaults=vault_addresses, block_number=block_number)
+    proxies = list(set(request.owner for request in exit_requests))
+    positions_owners = await graph_get_leverage_positions_owners(
+        proxies=proxies, block_number=block_number
+    )
+    leverage_strategy_contracts = dict(
+        zip(proxies, await asyncio.gather(*(get_leverage_strategy_contract(p) for p in proxies)))
+    )
 
-    for os_token_exit_request in exit_requests:
-        position_owner = await graph_get_leverage_position_owner(os_token_exit_request.owner)
-        vault = os_token_exit_request.vault
-        harvest_params = graph_vaults[vault].harvest_params
-
-        logger.info(
-            'Claiming exited assets: vault=%s, user=%s...',
-            vault,
-            position_owner,
-        )
-        leverage_strategy_contract = await get_leverage_strategy_contract(
-            os_token_exit_request.owner
-        )
-        tx_hash = await claim_exited_assets(
-            leverage_strategy_contract=leverage_strategy_contract,
-            vault=vault,
-            user=position_owner,
-            exit_request=os_token_exit_request.exit_request,
-            harvest_params=harvest_params,
-            block_number=block_number,
-        )
-        if tx_hash:
-            logger.info(
-                'Successfully claimed exited assets: vault=%s, user=%s...',
-                vault,
-                os_token_exit_request.owner,
+    bundle_items = await asyncio.gather(
+        *(
+            get_exit_request_bundle_item(
+                os_token_exit_request=os_token_exit_request,
+                position_owner=positions_owners[os_token_exit_request.owner],
+                leverage_strategy_contract=leverage_strategy_contracts[os_token_exit_request.owner],
+                harvest_params=graph_vaults[os_token_exit_request.vault].harvest_params,
+                block_number=block_number,
             )
+            for os_token_exit_request in exit_requests
+        )
+    )
+    await submit_bundles(bundle_items)
 
 
 async def fetch_leverage_positions(block_number: BlockNumber) -> list[LeveragePosition]:
@@ -123,19 +156,26 @@ async def fetch_leverage_positions(block_number: BlockNumber) -> list[LeveragePo
         await strategy_registry_contract.get_vault_ltv_percent(network_config.LEVERAGE_STRATEGY_ID)
         / WAD
     )
-    all_leverage_positions = await graph_get_leverage_positions(block_number=block_number)
-
     # Get aave positions by borrow ltv
-    aave_positions = [pos for pos in all_leverage_positions if pos.borrow_ltv > borrow_ltv]
+    aave_positions = await graph_get_leverage_positions(
+        block_number=block_number, borrow_ltv=borrow_ltv
+    )
     if not aave_positions:
         logger.info('No risky Aave leverage positions found')
         return []
 
     # Get vault positions by vault ltv
-    proxy_to_position = {position.proxy: position for position in all_leverage_positions}
     allocators = await graph_get_allocators(
-        ltv=vault_ltv, addresses=list(proxy_to_position.keys()), block_number=block_number
+        ltv=vault_ltv,
+        addresses=await graph_get_leverage_proxies(block_number=block_number),
+        block_number=block_number,
     )
+    proxy_to_position = {
+        position.proxy: position
+        for position in await graph_get_leverage_positions(
+            block_number=block_number, proxies=allocators
+        )
+    }
     vault_positions = []
     for allocator in allocators:
         vault_positions.append(proxy_to_position[allocator])
@@ -164,82 +204,92 @@ async def fetch_ostoken_exit_requests(block_number: BlockNumber) -> list[OsToken
     return exit_requests
 
 
-async def handle_leverage_position(
-    position: LeveragePosition, harvest_params: HarvestParams | None, block_number: BlockNumber
-) -> None:
+async def get_leverage_position_bundle_item(
+    position: LeveragePosition,
+    leverage_strategy_contract: LeverageStrategyContract,
+    harvest_params: HarvestParams | None,
+    can_force_exit_after_claim: bool,
+    block_number: BlockNumber,
+) -> BundleItem:
     """
-    Submit force exit for leverage position.
-    Also check for position active exit request and claim assets if possible.
+    Returns item forcing exit of a leverage position that can be forcefully closed.
+    Assets of the position active exit request are claimed first if possible.
+    The claim and the force exit are sent in the same transaction to keep their order,
+    the claim alone is the fallback in case the force exit fails.
     """
-    leverage_strategy_contract = await get_leverage_strategy_contract(position.proxy)
-    if not await can_force_enter_exit_queue(
+    update_state_call = await get_update_state_call(
         leverage_strategy_contract=leverage_strategy_contract,
         vault=position.vault,
-        user=position.user,
         harvest_params=harvest_params,
         block_number=block_number,
-    ):
-        logger.info(
-            'Skip leverage positions because it cannot be forcefully closed: vault=%s, user=%s...',
-            position.vault,
-            position.user,
-        )
-        return
-
-    # claim active exit request
-    if position.exit_request and position.exit_request.is_fully_claimable:
-        logger.info(
-            'Claiming exited assets for leverage positions: vault=%s, user=%s...',
-            position.vault,
-            position.user,
-        )
-        tx_hash = await claim_exited_assets(
-            leverage_strategy_contract=leverage_strategy_contract,
-            vault=position.vault,
-            user=position.user,
-            exit_request=position.exit_request,
-            harvest_params=harvest_params,
-            block_number=block_number,
-        )
-        if tx_hash:
-            logger.info(
-                'Successfully claimed exited assets for leverage positions: vault=%s, user=%s...',
-                position.vault,
-                position.user,
-            )
-        else:
-            return
-    logger.info(
-        'Force exiting leverage positions: vault=%s, user=%s...',
-        position.vault,
-        position.user,
     )
-
-    # recheck because position state has changed after claiming assets
-    if not await can_force_enter_exit_queue(
+    force_exit_call = encode_force_enter_exit_queue_call(
         leverage_strategy_contract=leverage_strategy_contract,
         vault=position.vault,
         user=position.user,
-        harvest_params=harvest_params,
-        block_number=block_number,
-    ):
-        logger.info(
-            'Skip leverage positions because it cannot be forcefully closed: vault=%s, user=%s...',
-            position.vault,
-            position.user,
+    )
+    force_exit_description = f'leverage position exit: vault={position.vault}, user={position.user}'
+    if not position.exit_request or not position.exit_request.is_fully_claimable:
+        return BundleItem(
+            description=force_exit_description,
+            update_state_call=update_state_call,
+            calls=[force_exit_call],
         )
-        return
 
-    tx_hash = await force_enter_exit_queue(
-        leverage_strategy_contract=leverage_strategy_contract,
-        vault=position.vault,
-        user=position.user,
-        harvest_params=harvest_params,
-        block_number=block_number,
+    claim_item = BundleItem(
+        description=(
+            f'leverage position exited assets claim: '
+            f'vault={position.vault}, user={position.user}'
+        ),
+        update_state_call=update_state_call,
+        calls=[
+            encode_claim_exited_assets_call(
+                leverage_strategy_contract=leverage_strategy_contract,
+                vault=position.vault,
+                user=position.user,
+                exit_request=position.exit_request,
+            )
+        ],
     )
-    if tx_hash:
+    # position state changes after claiming assets
+    if not can_force_exit_after_claim:
         logger.info(
-            'Successfully triggered exit for leverage positions: vault=%s, user=%s...',
+            'Skip leverage positions because it cannot be forcefully closed: vault=%s, user=%s...',
             position.vault,
             position.user,
         )
+        return claim_item
+
+    return BundleItem(
+        description=f'{force_exit_description} with exited assets claim',
+        update_state_call=update_state_call,
+        calls=[*claim_item.calls, force_exit_call],
+        fallback=claim_item,
+    )
+
+
+async def get_exit_request_bundle_item(
+    os_token_exit_request: OsTokenExitRequest,
+    position_owner: ChecksumAddress,
+    leverage_strategy_contract: LeverageStrategyContract,
+    harvest_params: HarvestParams | None,
+    block_number: BlockNumber,
+) -> BundleItem:
+    vault = os_token_exit_request.vault
+    return BundleItem(
+        description=f'exited assets claim: vault={vault}, user={position_owner}',
+        update_state_call=await get_update_state_call(
+            leverage_strategy_contract=leverage_strategy_contract,
+            vault=vault,
+            harvest_params=harvest_params,
+            block_number=block_number,
+        ),
+        calls=[
+            encode_claim_exited_assets_call(
+                leverage_strategy_contract=leverage_strategy_contract,
+                vault=vault,
+                user=position_owner,
+                exit_request=os_token_exit_request.exit_request,
+            )
+        ],
+    )
@@ -0,0 +1,148 @@
+import asyncio
+from contextlib import contextmanager
+from unittest import mock
+
+from hexbytes import HexBytes
+from sw_utils.tests import faker
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from periodic_tasks.exit.execution import (
+    BUNDLE_GAS_MARGIN,
+    _pack_bundles,
+    _submit_bundle,
+)
+from periodic_tasks.exit.typings import BundleItem
+
+
+def create_bundle_item(
+    gas: int = 100, update_state_call: tuple | None = None, fallback: BundleItem | None = None
+) -> BundleItem:
+    return BundleItem(
+        description=faker.eth_address(),
+        calls=[(faker.eth_address(), '0x01')],
+        update_state_call=update_state_call,
+        fallback=fallback,
+        gas=gas,
+    )
+
+
+class TestPackBundles:
+    def test_basic(self):
+        items = [create_bundle_item(gas) for gas in (40, 50, 20, 90, 120)]
+
+        bundles = _pack_bundles(items, bundle_gas_limit=100)
+
+        # order is kept, item above the limit gets its own bundle
+        assert bundles == [[items[0], items[1]], [items[2]], [items[3]], [items[4]]]
+
+
+class TestSubmitBundle:
+    async def test_update_state_deduplicated(self):
+        update_state_call = (faker.eth_address(), '0x02')
+        items = [create_bundle_item(update_state_call=update_state_call) for _ in range(2)]
+
+        with self.patch(receipts=[{'status': 1}]) as (aggregate_mock, transaction_mock):
+            await _submit_bundle(items, asyncio.Semaphore(1))
+
+        assert aggregate_mock.call_args_list == [
+            mock.call([update_state_call, items[0].calls[0], items[1].calls[0]])
+        ]
+        assert transaction_mock.call_args.kwargs['tx_params'] == {'gas': 200 + BUNDLE_GAS_MARGIN}
+
+    async def test_reverted_bundle_split(self):
+        items = [create_bundle_item() for _ in range(3)]
+
+        receipts = [{'status': 0}, {'status': 1}, {'status': 0}, {'status': 1}, {'status': 0}]
+        with self.patch(receipts=receipts) as (aggregate_mock, _):
+            await _submit_bundle(items, asyncio.Semaphore(1))
+
+        assert [c.args[0] for c in aggregate_mock.call_args_list] == [
+            [*items[0].calls, *items[1].calls, *items[2].calls],
+            items[0].calls,
+            [*items[1].calls, *items[2].calls],
+            items[1].calls,
+            items[2].calls,
+        ]
+
+    async def test_fallback_sent(self):
+        fallback = create_bundle_item()
+        items = [create_bundle_item(fallback=fallback)]
+
+        with self.patch(receipts=[{'status': 0}, {'status': 1}]) as (aggregate_mock, _):
+            aggregate_mock.return_value.estimate_gas = mock.AsyncMock(return_value=50)
+            await _submit_bundle(items, asyncio.Semaphore(1))
+
+        assert aggregate_mock.call_args_list == [
+            mock.call(items[0].calls),
+            mock.call(fallback.calls),
+            mock.call(fallback.calls),
+        ]
+
+    async def test_send_error_split(self):
+        items = [create_bundle_item() for _ in range(2)]
+
+        with self.patch(receipts=[{'status': 1}, {'status': 1}]) as (
+            aggregate_mock,
+            transaction_mock,
+        ):
+            transaction_mock.configure_mock(
+                side_effect=[ValueError('gas too low'), HexBytes('0x01'), HexBytes('0x02')]
+            )
+            await _submit_bundle(items, asyncio.Semaphore(1))
+
+        assert aggregate_mock.call_count == 3
+
+    async def test_pending_after_timeout_not_resent(self):
+        items = [create_bundle_item() for _ in range(2)]
+
+        with self.patch(receipts=[TimeExhausted()], is_pending=True) as (aggregate_mock, _):
+            await _submit_bundle(items, asyncio.Semaphore(1))
+
+        assert aggregate_mock.call_count == 1
+
+    async def test_mined_after_timeout_not_resent(self):
+        items = [create_bundle_item() for _ in range(2)]
+
+        with self.patch(receipts=[TimeExhausted()], late_receipt={'status': 1}) as (
+            aggregate_mock,
+            _,
+        ):
+            await _submit_bundle(items, asyncio.Semaphore(1))
+
+        assert aggregate_mock.call_count == 1
+
+    async def test_dropped_after_timeout_resent_once(self):
+        items = [create_bundle_item() for _ in range(2)]
+
+        with self.patch(receipts=[TimeExhausted(), TimeExhausted()]) as (aggregate_mock, _):
+            await _submit_bundle(items, asyncio.Semaphore(1))
+
+        assert aggregate_mock.call_count == 2
+        assert aggregate_mock.call_args_list[0] == aggregate_mock.call_args_list[1]
+
+    @contextmanager
+    def patch(
+        self,
+        receipts: list,
+        is_pending: bool = False,
+        late_receipt: dict | None = None,
+    ):
+        multicall_contract_mock = mock.Mock()
+        execution_client_mock = mock.Mock()
+        execution_client_mock.eth.get_transaction_receipt = mock.AsyncMock(
+            return_value=late_receipt, side_effect=None if late_receipt else TransactionNotFound()
+        )
+        execution_client_mock.eth.get_transaction = mock.AsyncMock(
+            side_effect=None if is_pending else TransactionNotFound()
+        )
+        with mock.patch(
+            'periodic_tasks.exit.execution.multicall_contract', multicall_contract_mock
+        ), mock.patch(
+            'periodic_tasks.exit.execution.execution_client', execution_client_mock
+        ), mock.patch(
+            'periodic_tasks.exit.execution.transaction_gas_wrapper',
+            return_value=HexBytes('0x01'),
+        ) as transaction_mock, mock.patch(
+            'periodic_tasks.exit.execution.wait_for_tx_receipt', side_effect=receipts
+        ):
+            yield multicall_contract_mock.functions.aggregate, transaction_mock
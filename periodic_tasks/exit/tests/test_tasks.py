@@ -0,0 +1,67 @@
+from unittest import mock
+
+from sw_utils.tests import faker
+from web3 import Web3
+
+from periodic_tasks.exit.execution import _pack_bundles
+from periodic_tasks.exit.tasks import get_leverage_position_bundle_item
+from periodic_tasks.exit.typings import BundleItem, ExitRequest, LeveragePosition
+
+
+def create_position(is_claimable: bool) -> LeveragePosition:
+    vault = faker.eth_address()
+    return LeveragePosition(
+        user=faker.eth_address(),
+        vault=vault,
+        proxy=faker.eth_address(),
+        borrow_ltv=0.9,
+        exit_request=ExitRequest(
+            id=faker.eth_address(),
+            vault=vault,
+            position_ticket=1,
+            timestamp=1,
+            exit_queue_index=1,
+            is_claimed=False,
+            is_claimable=is_claimable,
+            exited_assets=Web3.to_wei(1, 'ether'),
+            total_assets=Web3.to_wei(1, 'ether'),
+        ),
+    )
+
+
+async def get_bundle_item(position: LeveragePosition, can_force_exit_after_claim: bool):
+    leverage_strategy_contract = mock.Mock()
+    leverage_strategy_contract.encode_abi = lambda fn_name, args: fn_name
+    return await get_leverage_position_bundle_item(
+        position=position,
+        leverage_strategy_contract=leverage_strategy_contract,
+        harvest_params=None,
+        can_force_exit_after_claim=can_force_exit_after_claim,
+        block_number=1,
+    )
+
+
+class TestGetLeveragePositionBundleItem:
+    async def test_claim_and_force_exit_not_split(self):
+        item = await get_bundle_item(create_position(is_claimable=True), True)
+        item.gas = 60
+        other_item = BundleItem(description='other', calls=[], gas=60)
+
+        # the claim is followed by the force exit in the next bundle
+        bundles = _pack_bundles([other_item, item], bundle_gas_limit=100)
+
+        assert bundles == [[other_item], [item]]
+        assert [call for _, call in item.calls] == ['claimExitedAssets', 'forceEnterExitQueue']
+        assert item.fallback is not None
+        assert [call for _, call in item.fallback.calls] == ['claimExitedAssets']
+
+    async def test_claim_only(self):
+        item = await get_bundle_item(create_position(is_claimable=True), False)
+
+        assert [call for _, call in item.calls] == ['claimExitedAssets']
+        assert item.fallback is None
+
+    async def test_force_exit_only(self):
+        item = await get_bundle_item(create_position(is_claimable=False), True)
+
+        assert [call for _, call in item.calls] == ['forceEnterExitQueue']
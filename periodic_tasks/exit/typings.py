@@ -1,7 +1,8 @@
 from dataclasses import dataclass
 
-from web3 import Web3
-from web3.types import ChecksumAddress, Wei
+from web3.types import ChecksumAddress, HexStr, Wei
+
+from periodic_tasks.common.utils import to_checksum_address
 
 
 @dataclass
@@ -41,7 +42,7 @@ class ExitRequest:
         )
         return ExitRequest(
             id=data['id'],
-            vault=Web3.to_checksum_address(data['vault']['id']),
+            vault=to_checksum_address(data['vault']['id']),
             position_ticket=int(data['positionTicket']),
             timestamp=int(data['timestamp']),
             exit_queue_index=exit_queue_index,
@@ -65,6 +66,13 @@ class LeveragePosition:
         return f'{self.vault}-{self.user}'
 
 
+@dataclass
+class ForceExitEligibility:
+    can_force_exit: bool
+    # same as `can_force_exit` for positions without claimable exit request
+    can_force_exit_after_claim: bool
+
+
 @dataclass
 class OsTokenExitRequest:
     id: str
@@ -72,3 +80,22 @@ class OsTokenExitRequest:
     owner: ChecksumAddress
     ltv: int
     exit_request: ExitRequest
+
+
+@dataclass
+class BundleItem:
+    """
+    Calls always sent in the same transaction.
+    The fallback item is sent instead if the item fails on its own.
+    """
+
+    description: str
+    calls: list[tuple[ChecksumAddress, HexStr]]
+    update_state_call: tuple[ChecksumAddress, HexStr] | None = None
+    fallback: 'BundleItem | None' = None
+    gas: int = 0
+
+    def get_calls(self) -> list[tuple[ChecksumAddress, HexStr]]:
+        if self.update_state_call:
+            return [self.update_state_call, *self.calls]
+        return self.calls
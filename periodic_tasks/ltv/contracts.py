@@ -3,21 +3,20 @@ import logging
 from eth_typing import ChecksumAddress
 from hexbytes import HexBytes
 from web3 import Web3
+from web3.types import BlockNumber
 
 from periodic_tasks.common.clients import execution_client
-from periodic_tasks.common.contracts import ContractWrapper
+from periodic_tasks.common.contracts import ContractWrapper, multicall_contract
 from periodic_tasks.common.execution import transaction_gas_wrapper
 from periodic_tasks.common.settings import network_config
 from periodic_tasks.common.typings import HarvestParams
 
+from .typings import VaultMaxLtvUser
+
 logger = logging.getLogger(__name__)
 
 
 class VaultUserLTVTrackerContract(ContractWrapper):
-    async def get_max_ltv_user(self, vault: ChecksumAddress) -> ChecksumAddress:
-        user = await self.contract.functions.vaultToUser(vault).call()
-        return Web3.to_checksum_address(user)
-
     async def get_vault_max_ltv(
         self, vault: ChecksumAddress, harvest_params: HarvestParams | None
     ) -> int:
@@ -35,6 +34,55 @@ class VaultUserLTVTrackerContract(ContractWrapper):
             ),
         ).call()
 
+    async def get_vaults_max_ltv_users(
+        self,
+        max_ltv_allocators: dict[ChecksumAddress, ChecksumAddress],
+        vaults_harvest_params: dict[ChecksumAddress, HarvestParams | None],
+        block_number: BlockNumber,
+    ) -> list[VaultMaxLtvUser]:
+        """
+        Reads current max LTV and previous max LTV user for all vaults
+        using multicall pinned to the given block.
+        """
+        calls = []
+        for vault in max_ltv_allocators:
+            # Create zero harvest params in case the vault has no rewards yet
+            harvest_params = vaults_harvest_params[vault] or self._get_zero_harvest_params()
+            calls.append(
+                (
+                    self.address,
+                    self.encode_abi(
+                        fn_name='getVaultMaxLtv',
+                        args=[
+                            vault,
+                            (
+                                harvest_params.rewards_root,
+                                harvest_params.reward,
+                                harvest_params.unlocked_mev_reward,
+                                harvest_params.proof,
+                            ),
+                        ],
+                    ),
+                )
+            )
+            calls.append((self.address, self.encode_abi(fn_name='vaultToUser', args=[vault])))
+
+        response = await multicall_contract.aggregate_batches(calls, block_number)
+
+        max_ltv_users = []
+        for index, (vault, address) in enumerate(max_ltv_allocators.items()):
+            ltv_data, user_data = response[2 * index], response[2 * index + 1]
+            max_ltv_users.append(
+                VaultMaxLtvUser(
+                    address=address,
+                    prev_address=Web3.to_checksum_address(user_data[-20:]),
+                    vault=vault,
+                    ltv=Web3.to_int(ltv_data),
+                    harvest_params=vaults_harvest_params[vault],
+                )
+            )
+        return max_ltv_users
+
     async def update_vault_max_ltv_user(
         self, vault: ChecksumAddress, user: ChecksumAddress, harvest_params: HarvestParams | None
     ) -> HexBytes:
@@ -1,10 +1,12 @@
 import logging
 
-from eth_typing import ChecksumAddress
+from eth_typing import BlockNumber, ChecksumAddress
 from gql import gql
-from web3 import Web3
 
 from periodic_tasks.common.graph_client import graph_client
+from periodic_tasks.common.utils import chunkify, to_checksum_address
+
+from .settings import MAX_LTV_ALLOCATORS_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -22,32 +24,50 @@ async def graph_get_ostoken_vaults() -> list[ChecksumAddress]:
 
     response = await graph_client.run_query(query)
     vaults = response['networks'][0]['osTokenVaultIds']  # pylint: disable=unsubscriptable-object
-    return [Web3.to_checksum_address(vault) for vault in vaults]
+    return [to_checksum_address(vault) for vault in vaults]
 
 
-async def graph_get_vault_max_ltv_allocator(vault_address: str) -> ChecksumAddress | None:
-    query = gql(
-        """
-        query AllocatorsQuery($vault: String) {
-          allocators(
-            first: 1
-            orderBy: ltv
-            orderDirection: desc
-            where: { vault: $vault }
-          ) {
-            address
-          }
-        }
-        """
-    )
-    params = {
-        'vault': vault_address.lower(),
-    }
+async def graph_get_vaults_max_ltv_allocators(
+    vaults: list[ChecksumAddress],
+    block_number: BlockNumber,
+) -> dict[ChecksumAddress, ChecksumAddress | None]:
+    """
+    Returns mapping from vault address to the allocator having maximum LTV in the vault.
+    Vaults are queried in batches, each vault is a separate aliased `allocators` field.
+    """
+    result: dict[ChecksumAddress, ChecksumAddress | None] = {}
+
+    for vaults_chunk in chunkify(vaults, MAX_LTV_ALLOCATORS_BATCH_SIZE):
+        variables: list[str] = ['$block: Int']
+        fields: list[str] = []
+        params: dict = {'block': block_number}
+
+        for index, vault in enumerate(vaults_chunk):
+            variables.append(f'$vault_{index}: String')
+            fields.append(
+                f"""
+                vault_{index}: allocators(
+                  block: {{ number: $block }}
+                  first: 1
+                  orderBy: ltv
+                  orderDirection: desc
+                  where: {{ vault: $vault_{index} }}
+                ) {{
+                  address
+                }}
+                """
+            )
+            params[f'vault_{index}'] = vault.lower()
 
-    response = await graph_client.run_query(query, params)
-    allocators = response['allocators']  # pylint: disable=unsubscriptable-object
+        query = f"""
+            query AllocatorsQuery({', '.join(variables)}) {{
+              {''.join(fields)}
+            }}
+            """
+        response = await graph_client.run_query(gql(query), params)
 
-    if not allocators:
-        return None
+        for index, vault in enumerate(vaults_chunk):
+            allocators = response[f'vault_{index}']  # pylint: disable=unsubscriptable-object
+            result[vault] = to_checksum_address(allocators[0]['address']) if allocators else None
 
-    return Web3.to_checksum_address(allocators[0]['address'])
+    return result
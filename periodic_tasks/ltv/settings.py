@@ -7,3 +7,6 @@ GRAPH_API_TIMEOUT: int = config('GRAPH_API_TIMEOUT', default='10', cast=int)
 GRAPH_API_RETRY_TIMEOUT: int = config('GRAPH_API_RETRY_TIMEOUT', default='60', cast=int)
 
 SUPPORTED_NETWORKS = GNO_NETWORKS + ETH_NETWORKS
+
+# Number of vaults resolved in a single aliased max LTV allocators query
+MAX_LTV_ALLOCATORS_BATCH_SIZE: int = config('MAX_LTV_ALLOCATORS_BATCH_SIZE', default=50, cast=int)
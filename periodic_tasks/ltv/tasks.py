@@ -1,13 +1,19 @@
 import logging
 from decimal import Decimal
 
+from eth_typing import ChecksumAddress, HexStr
+from web3 import Web3
+from web3.types import BlockNumber
+
 from periodic_tasks.common.clients import execution_client
+from periodic_tasks.common.execution import wait_for_tx_confirmations
 from periodic_tasks.common.graph import graph_get_vaults
 from periodic_tasks.common.graph_client import graph_client
 from periodic_tasks.common.startup_checks import wait_for_graph_node_sync_to_block
+from periodic_tasks.common.typings import HarvestParams
 
 from .contracts import vault_user_ltv_tracker_contract
-from .graph import graph_get_ostoken_vaults, graph_get_vault_max_ltv_allocator
+from .graph import graph_get_ostoken_vaults, graph_get_vaults_max_ltv_allocators
 from .typings import VaultMaxLtvUser
 
 logger = logging.getLogger(__name__)
@@ -31,35 +37,57 @@ async def update_vault_max_ltv_user() -> None:
     )
 
     # Get max LTV user for vault
-    max_ltv_users = await get_max_ltv_users()
+    max_ltv_users = await get_max_ltv_users(block_number)
 
     if not max_ltv_users:
         logger.info('No max LTV users found. Nothing to update.')
         return
 
+    users_to_update: list[VaultMaxLtvUser] = []
     for user in max_ltv_users:
         if user.address == user.prev_address:
             logger.info('Max LTV user did not change since last update. Skip updating user.')
             continue
+        users_to_update.append(user)
 
+    # Submit all updates first, then wait for the transactions together
+    tx_hashes: list[HexStr] = []
+    for user in users_to_update:
         logger.info('Updating max LTV user for vault %s', user.vault)
-        await handle_max_ltv_user(user)
+        tx_hashes.append(await submit_max_ltv_user(user))
+
+    if tx_hashes:
+        logger.info('Waiting for %d tx receipts', len(tx_hashes))
+        await wait_for_tx_confirmations(execution_client, tx_hashes)
+        logger.info('Txs confirmed')
+
+    # Get LTV after update
+    for user in users_to_update:
+        ltv = await vault_user_ltv_tracker_contract.get_vault_max_ltv(
+            user.vault, user.harvest_params
+        )
+        logger.info('LTV for vault %s after update: %s', user.vault, Decimal(ltv) / WAD)
 
     logger.info('Completed')
 
 
-async def get_max_ltv_users() -> list[VaultMaxLtvUser]:
+async def get_max_ltv_users(block_number: BlockNumber) -> list[VaultMaxLtvUser]:
     ostoken_vaults = await graph_get_ostoken_vaults()
 
     if not ostoken_vaults:
         logger.info('No OsToken vaults found')
         return []
 
-    max_ltv_users = []
     graph_vaults = await graph_get_vaults(graph_client=graph_client, vaults=ostoken_vaults)
+    max_ltv_allocators = await graph_get_vaults_max_ltv_allocators(
+        ostoken_vaults, block_number=block_number
+    )
+
+    vaults_max_ltv_allocators: dict[ChecksumAddress, ChecksumAddress] = {}
+    vaults_harvest_params: dict[ChecksumAddress, HarvestParams | None] = {}
 
     for vault in ostoken_vaults:
-        max_ltv_user_address = await graph_get_vault_max_ltv_allocator(vault)
+        max_ltv_user_address = max_ltv_allocators[vault]
         if max_ltv_user_address is None:
             logger.warning('No allocators in vault %s', vault)
             continue
@@ -68,46 +96,28 @@ async def get_max_ltv_users() -> list[VaultMaxLtvUser]:
         harvest_params = graph_vaults[vault].harvest_params
         logger.debug('Harvest params for vault %s: %s', vault, harvest_params)
 
-        # Get current LTV
-        ltv = await vault_user_ltv_tracker_contract.get_vault_max_ltv(vault, harvest_params)
-        logger.info('Current LTV for vault %s: %s', vault, Decimal(ltv) / WAD)
-
-        # Get prev max LTV user
-        prev_max_ltv_user_address = await vault_user_ltv_tracker_contract.get_max_ltv_user(vault)
-
-        # Build VaultMaxLtvUser object
-        max_ltv_users.append(
-            VaultMaxLtvUser(
-                address=max_ltv_user_address,
-                prev_address=prev_max_ltv_user_address,
-                vault=vault,
-                ltv=ltv,
-                harvest_params=harvest_params,
-            )
+        vaults_max_ltv_allocators[vault] = max_ltv_user_address
+        vaults_harvest_params[vault] = harvest_params
+
+    # Get current LTV and prev max LTV user for all vaults
+    max_ltv_users = await vault_user_ltv_tracker_contract.get_vaults_max_ltv_users(
+        max_ltv_allocators=vaults_max_ltv_allocators,
+        vaults_harvest_params=vaults_harvest_params,
+        block_number=block_number,
+    )
+    for max_ltv_user in max_ltv_users:
+        logger.info(
+            'Current LTV for vault %s: %s', max_ltv_user.vault, Decimal(max_ltv_user.ltv) / WAD
         )
 
     return max_ltv_users
 
 
-async def handle_max_ltv_user(max_ltv_user: VaultMaxLtvUser) -> None:
-    vault = max_ltv_user.vault
+async def submit_max_ltv_user(max_ltv_user: VaultMaxLtvUser) -> HexStr:
     # Update LTV
     tx = await vault_user_ltv_tracker_contract.update_vault_max_ltv_user(
-        vault, max_ltv_user.address, max_ltv_user.harvest_params
-    )
-    logger.info('Update transaction sent, tx hash: %s', tx.hex())
-
-    # Wait for tx receipt
-    logger.info('Waiting for tx receipt')
-    receipt = await execution_client.eth.wait_for_transaction_receipt(tx)
-
-    # Check receipt status
-    if not receipt['status']:
-        raise RuntimeError(f'Update tx failed, tx hash: {tx.hex()}')
-    logger.info('Tx confirmed')
-
-    # Get LTV after update
-    ltv = await vault_user_ltv_tracker_contract.get_vault_max_ltv(
-        vault, max_ltv_user.harvest_params
+        max_ltv_user.vault, max_ltv_user.address, max_ltv_user.harvest_params
     )
-    logger.info('LTV for vault %s after update: %s', vault, Decimal(ltv) / WAD)
+    tx_hash = Web3.to_hex(tx)
+    logger.info('Update transaction sent, tx hash: %s', tx_hash)
+    return tx_hash
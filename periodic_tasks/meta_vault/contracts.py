@@ -1,12 +1,15 @@
+import asyncio
 import logging
 from typing import cast
 
-from eth_typing import BlockNumber, HexStr
+from eth_typing import BlockNumber, ChecksumAddress, HexStr
+from eth_utils import event_abi_to_log_topic
 from web3 import Web3
-from web3.contract.async_contract import AsyncContractEvent
-from web3.types import EventData, Wei
+from web3.types import Wei
 
 from periodic_tasks.common.contracts import ContractWrapper
+from periodic_tasks.common.execution import transaction_gas_wrapper
+from periodic_tasks.common.settings import EVENTS_CONCURRENCY
 from periodic_tasks.common.typings import HarvestParams
 from periodic_tasks.meta_vault.typings import SubVaultExitRequest
 
@@ -18,7 +21,9 @@ class MetaVaultContract(ContractWrapper):
         return await self.contract.functions.withdrawableAssets().call()
 
     async def deposit_to_sub_vaults(self) -> HexStr:
-        tx_hash = await self.contract.functions.depositToSubVaults().transact()
+        tx_hash = await transaction_gas_wrapper(
+            client=self.contract.w3, tx_function=self.contract.functions.depositToSubVaults()
+        )
         return Web3.to_hex(tx_hash)
 
     async def get_exit_queue_index(self, position_ticket: int) -> int:
@@ -27,18 +32,55 @@ class MetaVaultContract(ContractWrapper):
     def encoder(self) -> 'MetaVaultEncoder':
         return MetaVaultEncoder(self)
 
-    async def get_last_rewards_nonce_updated_event(
-        self, from_block: BlockNumber, to_block: BlockNumber
-    ) -> EventData | None:
+    async def get_rewards_nonce_updated_vaults(
+        self,
+        meta_vaults: list[ChecksumAddress],
+        from_block: BlockNumber,
+        to_block: BlockNumber,
+    ) -> set[ChecksumAddress]:
         """
-        Returns the latest RewardsNonceUpdated event data from the contract.
+        Returns meta vaults having RewardsNonceUpdated events in the given block range.
+        Events of all meta vaults are fetched with one get_logs call per log window,
+        several windows are fetched concurrently.
         """
-        event = await self._get_last_event(
-            event=cast(type[AsyncContractEvent], self.contract.events.RewardsNonceUpdated),
-            from_block=from_block,
-            to_block=to_block,
-        )
-        return event
+        if not meta_vaults:
+            return set()
+
+        event_abi = cast(dict, self.contract.events.RewardsNonceUpdated().abi)
+        topic = Web3.to_hex(event_abi_to_log_topic(event_abi))
+        updated_vaults: set[ChecksumAddress] = set()
+        while from_block <= to_block:
+            windows: list[tuple[BlockNumber, BlockNumber]] = []
+            window_from_block = from_block
+            while len(windows) < EVENTS_CONCURRENCY and window_from_block <= to_block:
+                window_to_block = BlockNumber(
+                    min(window_from_block + self._events_blocks_range, to_block)
+                )
+                windows.append((window_from_block, window_to_block))
+                window_from_block = BlockNumber(window_to_block + 1)
+
+            try:
+                windows_logs = await asyncio.gather(
+                    *(
+                        self.contract.w3.eth.get_logs(
+                            {
+                                'address': meta_vaults,
+                                'topics': [topic],
+                                'fromBlock': window_from_block,
+                                'toBlock': window_to_block,
+                            }
+                        )
+                        for window_from_block, window_to_block in windows
+                    )
+                )
+            except ValueError as e:
+                self._reduce_events_blocks_range(e)
+                continue
+
+            for logs in windows_logs:
+                updated_vaults.update(Web3.to_checksum_address(log['address']) for log in logs)
+            from_block = window_from_block
+        return updated_vaults
 
 
 class MetaVaultEncoder:
@@ -1,5 +1,6 @@
 import logging
 
+from eth_abi import decode
 from eth_typing import ChecksumAddress, HexStr
 from sw_utils import GNO_NETWORKS, convert_to_mgno
 from web3 import Web3
@@ -8,7 +9,6 @@ from web3.types import BlockNumber
 from periodic_tasks.common.clients import execution_client
 from periodic_tasks.common.contracts import (
     VaultContract,
-    get_vault_contract,
     keeper_contract,
     multicall_contract,
 )
@@ -35,6 +35,21 @@ async def process_meta_vaults() -> None:
         is_meta_vault=True,
     )
 
+    configured_meta_vaults = get_configured_meta_vault_addresses(meta_vaults_map)
+
+    # Fetch sub vaults of all meta vaults in all trees at once
+    sub_vaults_map = await fetch_meta_vaults_sub_vaults(
+        meta_vaults=configured_meta_vaults,
+        meta_vaults_map=meta_vaults_map,
+    )
+
+    # Check rewards nonce for all meta vaults in all trees at once
+    block_number = await execution_client.eth.get_block_number()
+    rewards_nonce_outdated_vaults = await get_rewards_nonce_outdated_meta_vaults(
+        meta_vaults=configured_meta_vaults,
+        block_number=block_number,
+    )
+
     vaults_updated_previously: set[ChecksumAddress] = set()
 
     for meta_vault_address in settings.META_VAULTS:
@@ -54,7 +69,9 @@ async def process_meta_vaults() -> None:
             vaults_updated_in_tree = await meta_vault_tree_update_state(
                 root_meta_vault=root_meta_vault,
                 meta_vaults_map=meta_vaults_map,
+                sub_vaults_map=sub_vaults_map,
                 vaults_updated_previously=vaults_updated_previously,
+                rewards_nonce_outdated_vaults=rewards_nonce_outdated_vaults,
             )
         except ClaimDelayNotPassedException as e:
             logger.error(
@@ -74,7 +91,9 @@ async def process_meta_vaults() -> None:
 async def meta_vault_tree_update_state(
     root_meta_vault: Vault,
     meta_vaults_map: dict[ChecksumAddress, Vault],
+    sub_vaults_map: dict[ChecksumAddress, Vault],
     vaults_updated_previously: set[ChecksumAddress],
+    rewards_nonce_outdated_vaults: set[ChecksumAddress],
 ) -> set[ChecksumAddress]:
     """
     Traverse the meta vault tree in bottom-up order and update the state for each meta vault.
@@ -91,7 +110,9 @@ async def meta_vault_tree_update_state(
     for meta_vault_address in meta_vault_addresses:
         vaults_updated_in_vault = await meta_vault_update_state(
             meta_vault=meta_vaults_map[meta_vault_address],
+            sub_vaults_map=sub_vaults_map,
             vaults_updated_previously=vaults_updated_previously,
+            rewards_nonce_outdated_vaults=rewards_nonce_outdated_vaults,
         )
         vaults_updated.update(vaults_updated_in_vault)
 
@@ -120,9 +141,49 @@ def get_meta_vault_addresses_bottom_up(
     return meta_vaults[::-1]
 
 
+async def fetch_meta_vaults_sub_vaults(
+    meta_vaults: list[ChecksumAddress],
+    meta_vaults_map: dict[ChecksumAddress, Vault],
+) -> dict[ChecksumAddress, Vault]:
+    """
+    Returns mapping from sub vault address to Vault object
+    for sub vaults of all given meta vaults, fetched with a single paged query.
+    """
+    sub_vaults: set[ChecksumAddress] = set()
+    for meta_vault_address in meta_vaults:
+        sub_vaults.update(meta_vaults_map[meta_vault_address].sub_vaults)
+
+    return await graph_get_vaults(
+        graph_client=graph_client,
+        vaults=sorted(sub_vaults),
+    )
+
+
+def get_configured_meta_vault_addresses(
+    meta_vaults_map: dict[ChecksumAddress, Vault],
+) -> list[ChecksumAddress]:
+    """
+    Returns addresses of all meta vaults in the trees of configured meta vaults.
+    """
+    meta_vault_addresses: set[ChecksumAddress] = set()
+    for meta_vault_address in settings.META_VAULTS:
+        root_meta_vault = meta_vaults_map.get(meta_vault_address)
+        if not root_meta_vault:
+            continue
+        meta_vault_addresses.update(
+            get_meta_vault_addresses_bottom_up(
+                root_meta_vault=root_meta_vault,
+                meta_vaults_map=meta_vaults_map,
+            )
+        )
+    return list(meta_vault_addresses)
+
+
 async def meta_vault_update_state(
     meta_vault: Vault,
+    sub_vaults_map: dict[ChecksumAddress, Vault],
     vaults_updated_previously: set[ChecksumAddress],
+    rewards_nonce_outdated_vaults: set[ChecksumAddress],
 ) -> set[ChecksumAddress]:
     """
     Update the state for the root meta vault.
@@ -133,10 +194,17 @@ async def meta_vault_update_state(
     Subgraph may not sync fast enough to reflect the state changes made by previous transactions,
     so we need to keep track of the vaults that have already been updated.
 
+    `sub_vaults_map` contains sub vaults of all meta vaults being processed.
+
+    `rewards_nonce_outdated_vaults` is a set of meta vaults whose rewards nonce
+    is behind the Keeper contract.
+
     Returns a set of vault addresses that were updated in this call.
     """
     calls_with_description = await _get_meta_vault_update_state_calls(
         meta_vault=meta_vault,
+        sub_vaults_map=sub_vaults_map,
+        rewards_nonce_outdated_vaults=rewards_nonce_outdated_vaults,
     )
 
     calls: list[tuple[ChecksumAddress, HexStr]] = []
@@ -177,6 +245,8 @@ async def meta_vault_update_state(
 
 async def _get_meta_vault_update_state_calls(
     meta_vault: Vault,
+    sub_vaults_map: dict[ChecksumAddress, Vault],
+    rewards_nonce_outdated_vaults: set[ChecksumAddress],
 ) -> list[ContractCall]:
     """
     Get state update calls for a single meta vault and its sub vaults.
@@ -186,10 +256,11 @@ async def _get_meta_vault_update_state_calls(
     logger.info('Getting state update calls for meta vault %s', meta_vault.address)
 
     # Get sub vaults
-    sub_vaults = await graph_get_vaults(
-        graph_client=graph_client,
-        vaults=meta_vault.sub_vaults,
-    )
+    sub_vaults = [
+        sub_vaults_map[sub_vault]
+        for sub_vault in meta_vault.sub_vaults
+        if sub_vault in sub_vaults_map
+    ]
     sub_vaults_to_harvest: list[ChecksumAddress] = []
     calls: list[ContractCall] = []
 
@@ -201,7 +272,7 @@ async def _get_meta_vault_update_state_calls(
     ).encoder()
 
     # Filter harvestable sub vaults and prepare calls for updating their state
-    for sub_vault in sub_vaults.values():
+    for sub_vault in sub_vaults:
         if not sub_vault.can_harvest:
             logger.info('Sub vault %s is not harvestable, skipping', sub_vault.address)
             continue
@@ -255,9 +326,7 @@ async def _get_meta_vault_update_state_calls(
         logger.info('No sub vault exit requests to claim for meta vault %s', meta_vault.address)
 
     # Update meta vault state
-    is_rewards_nonce_outdated = await is_meta_vault_rewards_nonce_outdated(
-        meta_vault_contract=meta_vault_contract,
-    )
+    is_rewards_nonce_outdated = meta_vault.address in rewards_nonce_outdated_vaults
 
     if sub_vaults_to_harvest or is_rewards_nonce_outdated:
         calls.append(
@@ -322,15 +391,28 @@ async def fix_exit_queue_indexes(sub_vault_exit_requests: list[SubVaultExitReque
     and the Subgraph has not yet indexed the change.
 
     This function updates any sub vault exit requests that have
-    a null exit queue index by fetching the correct value from the contract.
+    a null exit queue index by fetching the correct values from the contracts.
+    All indexes are read with multicall at the same block.
     """
-    for sub_vault_exit_request in sub_vault_exit_requests:
-        if sub_vault_exit_request.exit_queue_index is not None:
-            continue
-        sub_vault_contract = get_vault_contract(sub_vault_exit_request.vault)
-        exit_queue_index = await sub_vault_contract.get_exit_queue_index(
-            sub_vault_exit_request.position_ticket
-        )
+    missing_index_requests = [r for r in sub_vault_exit_requests if r.exit_queue_index is None]
+    if not missing_index_requests:
+        return
+
+    vault_encoder = VaultContract(
+        abi_path='abi/IEthVault.json',
+        address=ZERO_CHECKSUM_ADDRESS,
+        client=execution_client,
+    ).encoder()
+    calls = [
+        (r.vault, vault_encoder.get_exit_queue_index(r.position_ticket))
+        for r in missing_index_requests
+    ]
+    block_number = await execution_client.eth.get_block_number()
+    response = await multicall_contract.aggregate_batches(calls, block_number)
+
+    for sub_vault_exit_request, data in zip(missing_index_requests, response):
+        # getExitQueueIndex returns -1 if the exit request is not processed yet
+        (exit_queue_index,) = decode(['int256'], data)
         if exit_queue_index == -1:
             continue
         logger.info(
@@ -341,33 +423,40 @@ async def fix_exit_queue_indexes(sub_vault_exit_requests: list[SubVaultExitReque
         sub_vault_exit_request.exit_queue_index = exit_queue_index
 
 
-async def is_meta_vault_rewards_nonce_outdated(
-    meta_vault_contract: MetaVaultContract,
-) -> bool:
+async def get_rewards_nonce_outdated_meta_vaults(
+    meta_vaults: list[ChecksumAddress],
+    block_number: BlockNumber,
+) -> set[ChecksumAddress]:
     """
-    Check if the meta vault rewards nonce is outdated compared to the keeper contract.
+    Returns meta vaults whose rewards nonce is outdated compared to the keeper contract.
     We can't read the rewards nonce from meta vault directly
     because it is stored in private attribute.
     Solution: compare events.
+    The Keeper event is resolved once and shared by all meta vaults.
     """
-    current_block = await execution_client.eth.get_block_number()
+    if not meta_vaults:
+        return set()
 
     # Find the last rewards updated event in the Keeper contract
-    keeper_event = await keeper_contract.get_last_rewards_updated_event(
-        from_block=network_config.KEEPER_GENESIS_BLOCK, to_block=current_block
-    )
-    if keeper_event is None:
+    keeper_event_block = await keeper_contract.get_last_rewards_updated_block(to_block=block_number)
+    if keeper_event_block is None:
         logger.info('No RewardsUpdated event found in the Keeper contract')
-        return False
+        return set()
 
-    # Find the last rewards nonce updated event in the meta vault contract
-    # since the last Keeper vote
-    meta_vault_event = await meta_vault_contract.get_last_rewards_nonce_updated_event(
-        from_block=BlockNumber(keeper_event['blockNumber'] + 1), to_block=current_block
+    # Find meta vaults having rewards nonce updated events since the last Keeper vote
+    meta_vault_contract = MetaVaultContract(
+        abi_path='abi/IEthMetaVault.json',
+        address=ZERO_CHECKSUM_ADDRESS,
+        client=execution_client,
+    )
+    updated_meta_vaults = await meta_vault_contract.get_rewards_nonce_updated_vaults(
+        meta_vaults=meta_vaults,
+        from_block=BlockNumber(keeper_event_block + 1),
+        to_block=block_number,
     )
 
     # If no meta vault event is found, the rewards nonce is outdated
-    return meta_vault_event is None
+    return set(meta_vaults) - updated_meta_vaults
 
 
 async def process_deposit_to_sub_vaults(meta_vault_address: ChecksumAddress) -> None:
@@ -0,0 +1,30 @@
+from unittest import mock
+
+from eth_typing import BlockNumber
+from sw_utils.tests import faker
+
+from periodic_tasks.common.clients import get_execution_client
+from periodic_tasks.meta_vault.contracts import MetaVaultContract
+
+
+class TestRewardsNonceUpdatedVaults:
+    async def test_log_windows(self):
+        client = get_execution_client('http://localhost')
+        contract = MetaVaultContract(
+            abi_path='abi/IEthMetaVault.json', address=faker.eth_address(), client=client
+        )
+        contract._events_blocks_range = 9
+        meta_vault_0, meta_vault_1 = faker.eth_address(), faker.eth_address()
+
+        get_logs_mock = mock.AsyncMock(side_effect=[[{'address': meta_vault_0}], [], []])
+        with mock.patch.object(client.eth, 'get_logs', new=get_logs_mock):
+            updated_vaults = await contract.get_rewards_nonce_updated_vaults(
+                meta_vaults=[meta_vault_0, meta_vault_1],
+                from_block=BlockNumber(1),
+                to_block=BlockNumber(30),
+            )
+
+        assert updated_vaults == {meta_vault_0}
+        assert [
+            (c.args[0]['fromBlock'], c.args[0]['toBlock']) for c in get_logs_mock.call_args_list
+        ] == [(1, 10), (11, 20), (21, 30)]
@@ -1,15 +1,18 @@
 from contextlib import contextmanager
 from unittest import mock
 
+from eth_abi import encode
 from eth_typing import ChecksumAddress
-from sw_utils.graph import GraphClient
+from sw_utils.tests import faker
 
 from periodic_tasks.common.typings import Vault
 from periodic_tasks.meta_vault.tasks import (
+    fix_exit_queue_indexes,
     meta_vault_tree_update_state,
     multicall_contract,
 )
 from periodic_tasks.meta_vault.tests.factories import create_vault
+from periodic_tasks.meta_vault.typings import SubVaultExitRequest
 
 
 class TestMetaVaultUpdateStateCalls:
@@ -22,7 +25,7 @@ class TestMetaVaultUpdateStateCalls:
             meta_vault.address: meta_vault,
         }
         vaults_updated_previously = set()
-        graph_mock = GraphMock(
+        sub_vaults_map = get_vaults_map(
             [
                 meta_vault,
                 sub_vault_0,
@@ -31,11 +34,13 @@ class TestMetaVaultUpdateStateCalls:
         )
 
         # Act
-        with self.patch(graph_mock=graph_mock) as tx_aggregate_mock:
+        with self.patch() as tx_aggregate_mock:
             vaults_updated = await meta_vault_tree_update_state(
                 root_meta_vault=meta_vault,
                 meta_vaults_map=meta_vaults_map,
+                sub_vaults_map=sub_vaults_map,
                 vaults_updated_previously=vaults_updated_previously,
+                rewards_nonce_outdated_vaults=set(),
             )
 
         # Assert
@@ -56,7 +61,7 @@ class TestMetaVaultUpdateStateCalls:
         meta_vaults_map = {
             meta_vault.address: meta_vault,
         }
-        graph_mock = GraphMock(
+        sub_vaults_map = get_vaults_map(
             [
                 meta_vault,
                 sub_vault_0,
@@ -66,11 +71,13 @@ class TestMetaVaultUpdateStateCalls:
         vaults_updated_previously = {meta_vault.address, *meta_vault.sub_vaults}
 
         # Act
-        with self.patch(graph_mock=graph_mock) as tx_aggregate_mock:
+        with self.patch() as tx_aggregate_mock:
             vaults_updated = await meta_vault_tree_update_state(
                 root_meta_vault=meta_vault,
                 meta_vaults_map=meta_vaults_map,
+                sub_vaults_map=sub_vaults_map,
                 vaults_updated_previously=vaults_updated_previously,
+                rewards_nonce_outdated_vaults=set(),
             )
 
         # Assert
@@ -85,7 +92,7 @@ class TestMetaVaultUpdateStateCalls:
         meta_vaults_map = {
             meta_vault.address: meta_vault,
         }
-        graph_mock = GraphMock(
+        sub_vaults_map = get_vaults_map(
             [
                 meta_vault,
                 sub_vault_0,
@@ -95,11 +102,13 @@ class TestMetaVaultUpdateStateCalls:
         vaults_updated_previously = {meta_vault.sub_vaults[0]}
 
         # Act
-        with self.patch(graph_mock=graph_mock) as tx_aggregate_mock:
+        with self.patch() as tx_aggregate_mock:
             vaults_updated = await meta_vault_tree_update_state(
                 root_meta_vault=meta_vault,
                 meta_vaults_map=meta_vaults_map,
+                sub_vaults_map=sub_vaults_map,
                 vaults_updated_previously=vaults_updated_previously,
+                rewards_nonce_outdated_vaults=set(),
             )
 
         # Assert
@@ -127,7 +136,7 @@ class TestMetaVaultUpdateStateCalls:
             sub_vault_0.address: sub_vault_0,
         }
         vaults_updated_previously = set()
-        graph_mock = GraphMock(
+        sub_vaults_map = get_vaults_map(
             [
                 meta_vault,
                 sub_vault_0,
@@ -138,11 +147,13 @@ class TestMetaVaultUpdateStateCalls:
         )
 
         # Act
-        with self.patch(graph_mock=graph_mock) as tx_aggregate_mock:
+        with self.patch() as tx_aggregate_mock:
             vaults_updated = await meta_vault_tree_update_state(
                 root_meta_vault=meta_vault,
                 meta_vaults_map=meta_vaults_map,
+                sub_vaults_map=sub_vaults_map,
                 vaults_updated_previously=vaults_updated_previously,
+                rewards_nonce_outdated_vaults=set(),
             )
 
         # Assert
@@ -182,7 +193,7 @@ class TestMetaVaultUpdateStateCalls:
             meta_vault.address: meta_vault,
             sub_vault_0.address: sub_vault_0,
         }
-        graph_mock = GraphMock(
+        sub_vaults_map = get_vaults_map(
             [
                 meta_vault,
                 sub_vault_0,
@@ -194,11 +205,13 @@ class TestMetaVaultUpdateStateCalls:
         vaults_updated_previously = {sub_vault_0.address, *sub_vault_0.sub_vaults}
 
         # Act
-        with self.patch(graph_mock=graph_mock) as tx_aggregate_mock:
+        with self.patch() as tx_aggregate_mock:
             vaults_updated = await meta_vault_tree_update_state(
                 root_meta_vault=meta_vault,
                 meta_vaults_map=meta_vaults_map,
+                sub_vaults_map=sub_vaults_map,
                 vaults_updated_previously=vaults_updated_previously,
+                rewards_nonce_outdated_vaults=set(),
             )
 
         # Assert
@@ -226,7 +239,7 @@ class TestMetaVaultUpdateStateCalls:
             meta_vault.address: meta_vault,
             sub_vault_0.address: sub_vault_0,
         }
-        graph_mock = GraphMock(
+        sub_vaults_map = get_vaults_map(
             [
                 meta_vault,
                 sub_vault_0,
@@ -238,11 +251,13 @@ class TestMetaVaultUpdateStateCalls:
         vaults_updated_previously = {sub_vault_2.address}
 
         # Act
-        with self.patch(graph_mock=graph_mock) as tx_aggregate_mock:
+        with self.patch() as tx_aggregate_mock:
             vaults_updated_previously = await meta_vault_tree_update_state(
                 root_meta_vault=meta_vault,
                 meta_vaults_map=meta_vaults_map,
+                sub_vaults_map=sub_vaults_map,
                 vaults_updated_previously=vaults_updated_previously,
+                rewards_nonce_outdated_vaults=set(),
             )
 
         # Assert
@@ -258,16 +273,41 @@ class TestMetaVaultUpdateStateCalls:
             meta_vault.address,
         }
 
+    async def test_rewards_nonce_outdated(self):
+        # Arrange
+        meta_vault = create_vault(is_meta_vault=True, sub_vaults_count=2)
+        sub_vault_0 = create_vault(address=meta_vault.sub_vaults[0], can_harvest=False)
+        sub_vault_1 = create_vault(address=meta_vault.sub_vaults[1], can_harvest=False)
+        meta_vaults_map = {
+            meta_vault.address: meta_vault,
+        }
+        sub_vaults_map = get_vaults_map(
+            [
+                meta_vault,
+                sub_vault_0,
+                sub_vault_1,
+            ]
+        )
+
+        # Act
+        with self.patch() as tx_aggregate_mock:
+            vaults_updated = await meta_vault_tree_update_state(
+                root_meta_vault=meta_vault,
+                meta_vaults_map=meta_vaults_map,
+                sub_vaults_map=sub_vaults_map,
+                vaults_updated_previously=set(),
+                rewards_nonce_outdated_vaults={meta_vault.address},
+            )
+
+        # Assert
+        calls = tx_aggregate_mock.call_args[0][0]
+        assert [c[0] for c in calls] == [meta_vault.address]
+        assert vaults_updated == {meta_vault.address}
+
     @contextmanager
-    def patch(self, graph_mock: 'GraphMock'):
+    def patch(self):
         with mock.patch(
-            'periodic_tasks.meta_vault.tasks.graph_get_vaults',
-            graph_mock.graph_get_vaults,
-        ), mock.patch(
             'periodic_tasks.meta_vault.tasks.get_claimable_sub_vault_exit_requests', return_value=[]
-        ), mock.patch(
-            'periodic_tasks.meta_vault.tasks.is_meta_vault_rewards_nonce_outdated',
-            return_value=False,
         ), mock.patch.object(
             multicall_contract, 'tx_aggregate', return_value='0x123'
         ) as tx_aggregate_mock, mock.patch(
@@ -276,20 +316,37 @@ class TestMetaVaultUpdateStateCalls:
             yield tx_aggregate_mock
 
 
-class GraphMock:
-    def __init__(self, vaults: list[ChecksumAddress]):
-        self._vaults = {vault.address: vault for vault in vaults}
+class TestFixExitQueueIndexes:
+    async def test_basic(self):
+        # Arrange
+        exit_requests = [
+            SubVaultExitRequest(
+                exit_queue_index=None,
+                vault=faker.eth_address(),
+                timestamp=0,
+                position_ticket=position_ticket,
+            )
+            for position_ticket in range(3)
+        ]
+        exit_requests[1].exit_queue_index = 5
+
+        # Act
+        with mock.patch(
+            'periodic_tasks.meta_vault.tasks.execution_client.eth.get_block_number',
+            new=mock.AsyncMock(return_value=100),
+        ), mock.patch.object(
+            multicall_contract,
+            'aggregate_batches',
+            return_value=[encode(['int256'], [7]), encode(['int256'], [-1])],
+        ) as aggregate_mock:
+            await fix_exit_queue_indexes(exit_requests)
+
+        # Assert
+        calls = aggregate_mock.call_args[0][0]
+        assert [c[0] for c in calls] == [exit_requests[0].vault, exit_requests[2].vault]
+        assert aggregate_mock.call_args[0][1] == 100
+        assert [r.exit_queue_index for r in exit_requests] == [7, 5, None]
 
-    async def graph_get_vaults(
-        self, graph_client: GraphClient, vaults: list[ChecksumAddress]
-    ) -> dict[ChecksumAddress, Vault]:
-        """
-        Simulate fetching vaults from the graph
-        """
-        res = {}
-        for vault_address in vaults:
-            if vault_address not in self._vaults:
-                continue
-            res[vault_address] = self._vaults[vault_address]
 
-        return res
+def get_vaults_map(vaults: list[Vault]) -> dict[ChecksumAddress, Vault]:
+    return {vault.address: vault for vault in vaults}
@@ -1,18 +1,22 @@
 import asyncio
 import logging
 import time
+from typing import Any, Coroutine
 
+from eth_typing import BlockNumber
 from prometheus_client import Gauge, Info, start_http_server
 from sw_utils import InterruptHandler
 
 import periodic_tasks
-from periodic_tasks import _get_project_meta
 from periodic_tasks.common.clients import execution_client
+from periodic_tasks.common.contracts import contract_registry
+from periodic_tasks.common.graph_cache import graph_cache_scope
 from periodic_tasks.common.graph_client import graph_client
 from periodic_tasks.common.logs import setup_logging
 from periodic_tasks.common.networks import ZERO_CHECKSUM_ADDRESS
 from periodic_tasks.common.sentry import setup_sentry
 from periodic_tasks.common.settings import (
+    METRICS_COLLECTOR_TIMEOUT,
     METRICS_HOST,
     METRICS_PORT,
     METRICS_REFRESH_INTERNAL,
@@ -60,8 +64,25 @@ class Metrics:
             labelnames=['network', 'user', 'vault'],
         )
 
+        # Label values set on the last refresh, per gauge
+        self._gauge_labels: dict[Gauge, set[tuple[str, str]]] = {}
+
+    def set_user_vault_snapshot(self, gauge: Gauge, values: dict[tuple[str, str], float]) -> None:
+        """
+        Replaces gauge series with the latest top records labelled by (user, vault).
+        Series missing from the snapshot are removed,
+        the number of series is capped by RECORDS_LIMIT.
+        """
+        labels = set(list(values)[:RECORDS_LIMIT])
+        for user, vault in self._gauge_labels.get(gauge, set()) - labels:
+            gauge.remove(NETWORK, user, vault)
+
+        for user, vault in labels:
+            gauge.labels(network=NETWORK, user=user, vault=vault).set(values[(user, vault)])
+        self._gauge_labels[gauge] = labels
+
     def set_app_version(self) -> None:
-        self.app_version.labels(network=NETWORK).info({'version': _get_project_meta()['version']})
+        self.app_version.labels(network=NETWORK).info({'version': periodic_tasks.__version__})
 
 
 metrics = Metrics()
@@ -77,26 +98,68 @@ async def liquidation_metrics() -> None:
     )
     metrics.execution_block.labels(network=NETWORK).set(block_number)
 
+    # All collectors read the same block
+    collectors: dict[str, Coroutine[Any, Any, None]] = {}
     if network_config.OSTOKEN_VAULT_ESCROW_CONTRACT_ADDRESS != ZERO_CHECKSUM_ADDRESS:
-        exit_requests = await fetch_ostoken_exit_requests(block_number)
-        for exit_request in exit_requests[:RECORDS_LIMIT]:
-            metrics.ostoken_exit_request_ltv.labels(
-                network=NETWORK, user=exit_request.owner, vault=exit_request.vault
-            ).set(exit_request.ltv)
+        collectors['ostoken_exit_requests'] = ostoken_exit_requests_metrics(block_number)
 
     if network_config.LEVERAGE_STRATEGY_ID:
-        leverage_positions = await fetch_leverage_positions(block_number)
-        for leverage_position in leverage_positions[:RECORDS_LIMIT]:
-            metrics.leverage_position_ltv.labels(
-                network=NETWORK, user=leverage_position.user, vault=leverage_position.vault
-            ).set(leverage_position.borrow_ltv)
+        collectors['leverage_positions'] = leverage_positions_metrics(block_number)
 
     if network_config.VAULT_USER_LTV_TRACKER_CONTRACT_ADDRESS != ZERO_CHECKSUM_ADDRESS:
-        max_ltv_users = await get_max_ltv_users()
-        for max_ltv_user in max_ltv_users[:RECORDS_LIMIT]:
-            metrics.user_max_ltv.labels(
-                network=NETWORK, user=max_ltv_user.address, vault=max_ltv_user.vault
-            ).set(max_ltv_user.ltv)
+        collectors['max_ltv_users'] = max_ltv_users_metrics(block_number)
+
+    # subgraph responses are reused within a single refresh only
+    with graph_cache_scope():
+        await asyncio.gather(*(run_collector(name, coro) for name, coro in collectors.items()))
+    contract_registry.log_stats()
+
+
+async def run_collector(name: str, coro: Coroutine[Any, Any, None]) -> None:
+    """
+    Runs collector with a timeout, so that a slow collector does not delay the others.
+    Series of a failed collector are kept until its next successful refresh.
+    """
+    try:
+        await asyncio.wait_for(coro, timeout=METRICS_COLLECTOR_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning('Metrics collector %s timed out', name)
+    except Exception as e:
+        logger.error('Metrics collector %s failed: %s', name, e)
+        logger.exception(e)
+
+
+async def ostoken_exit_requests_metrics(block_number: BlockNumber) -> None:
+    exit_requests = await fetch_ostoken_exit_requests(block_number)
+    metrics.set_user_vault_snapshot(
+        metrics.ostoken_exit_request_ltv,
+        {
+            (exit_request.owner, exit_request.vault): exit_request.ltv
+            for exit_request in exit_requests[:RECORDS_LIMIT]
+        },
+    )
+
+
+async def leverage_positions_metrics(block_number: BlockNumber) -> None:
+    leverage_positions = await fetch_leverage_positions(block_number)
+    metrics.set_user_vault_snapshot(
+        metrics.leverage_position_ltv,
+        {
+            (leverage_position.user, leverage_position.vault): leverage_position.borrow_ltv
+            for leverage_position in leverage_positions[:RECORDS_LIMIT]
+        },
+    )
+
+
+async def max_ltv_users_metrics(block_number: BlockNumber) -> None:
+    max_ltv_users = await get_max_ltv_users(block_number)
+    metrics.set_user_vault_snapshot(
+        metrics.user_max_ltv,
+        {
+            (max_ltv_user.address, max_ltv_user.vault): max_ltv_user.ltv
+            for max_ltv_user in max_ltv_users[:RECORDS_LIMIT]
+        },
+    )
 
 
 async def main() -> None:
@@ -1,11 +1,13 @@
+import asyncio
 import logging
 import time
 from datetime import timedelta
 
+from web3 import Web3
 from web3.types import TxParams
 
 from periodic_tasks.common.clients import hot_wallet_account
-from periodic_tasks.common.execution import transaction_gas_wrapper
+from periodic_tasks.common.execution import transaction_gas_wrapper, wait_for_tx_receipt
 from periodic_tasks.price.clients import sender_execution_client
 from periodic_tasks.price.contracts import (
     price_feed_sender_contract,
@@ -55,7 +57,7 @@ async def check_and_sync() -> None:
     )
 
     logger.info('Sync transaction sent: %s', tx.hex())
-    receipt = await sender_execution_client.eth.wait_for_transaction_receipt(tx)
+    receipt = await wait_for_tx_receipt(sender_execution_client, Web3.to_hex(tx))
 
     if not receipt['status']:
         raise RuntimeError(f'Sync transaction failed, tx hash: {tx.hex()}')
@@ -73,7 +75,7 @@ async def check_and_sync() -> None:
             logger.info('Timestamp updated on the target chain.')
             return
         logger.info('Waiting for the timestamp to update...')
-        time.sleep(check_interval_sec)
+        await asyncio.sleep(check_interval_sec)
 
     raise TimeoutError(
         f'Timestamp did not update on the target chain within {check_interval_sec} sec.'